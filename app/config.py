@@ -3,6 +3,7 @@ from pydantic_settings import BaseSettings
 from functools import lru_cache
 from typing import Optional
 import os
+import tempfile
 
 
 print(f"Current working directory: {os.getcwd()}")
@@ -13,6 +14,7 @@ print(f"Full path to .env: {os.path.abspath('.env')}")
 class Settings(BaseSettings):
     # Application settings
     DB_TYPE: str = "postgresql"
+    DB_DRIVER: str = "psycopg2"  # psycopg2 | psycopg3 | asyncpg (async engines only)
 
     PROJECT_NAME: str = "FastAPI Auth System"
     VERSION: str = "1.0.0"
@@ -23,6 +25,60 @@ class Settings(BaseSettings):
     SECRET_KEY: str = "your-secret-key-here"
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    REFRESH_TOKEN_EXPIRE_DAYS: int = 14
+
+    # Session maintenance
+    SESSION_PURGE_INTERVAL_SECONDS: int = 3600
+    SESSION_PURGE_BATCH_SIZE: int = 500
+
+    # Background scheduler
+    SCHEDULER_ENABLED: bool = True  # maintenance jobs; the readiness ping always runs
+    SCHEDULER_LOCK_KEY: int = 727_300_001
+    SCHEDULER_LOCK_FILE: Optional[str] = None
+    SCHEDULER_JITTER_SECONDS: float = 30.0
+
+    # Health probes
+    HEALTH_CHECK_INTERVAL_SECONDS: float = 5.0
+    POOL_PREWARM: bool = True
+
+    # User statistics
+    USER_STATS_DAILY_RETENTION_DAYS: int = 90
+    USER_STATS_RECONCILE_CRON: str = "17 3 * * *"
+
+    # Username/email availability
+    AVAILABILITY_BLOOM_ERROR_RATE: float = 0.01
+    AVAILABILITY_REBUILD_INTERVAL_SECONDS: int = 600
+
+    # Authentication audit log
+    AUDIT_ENABLED: bool = True
+    AUDIT_QUEUE_SIZE: int = 10_000
+    AUDIT_BATCH_SIZE: int = 500
+    AUDIT_FLUSH_INTERVAL_SECONDS: float = 1.0
+    AUDIT_OVERFLOW_POLICY: str = "drop_oldest"  # drop_oldest | spill
+    AUDIT_SPILL_FILE: Optional[str] = None
+
+    # Schema snapshot
+    SCHEMA_REFRESH_INTERVAL_SECONDS: int = 300
+
+    # Authenticated principal cache (per worker)
+    PRINCIPAL_CACHE_TTL_SECONDS: float = 30.0
+    PRINCIPAL_CACHE_SIZE: int = 10_000
+
+    # Request profiling (opt-in)
+    PROFILING_ENABLED: bool = False
+    PROFILING_MODE: str = "sampling"  # sampling | cprofile
+    PROFILING_SAMPLE_RATE: float = 0.0
+    PROFILING_HEADER: str = "X-Profile"
+    PROFILING_SIGNATURE_TTL_SECONDS: int = 300
+    PROFILING_INTERVAL_MS: float = 1.0
+    PROFILING_DIR: str = os.path.join(tempfile.gettempdir(), "profiles")
+    PROFILING_MAX_PROFILES: int = 100
+
+    # Multi-tenant databases
+    TENANT_HEADER: str = "X-Tenant-ID"
+    TENANT_DATABASE_URLS: dict = {}
+    DB_ENGINE_CACHE_SIZE: int = 8
+    DB_ENGINE_IDLE_SECONDS: int = 900
 
     # CORS
     BACKEND_CORS_ORIGINS: list = ["http://localhost:8080"]
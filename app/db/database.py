@@ -1,19 +1,26 @@
 # app/db/database.py
 from abc import ABC, abstractmethod
-from sqlalchemy import create_engine, text, inspect
-from sqlalchemy.orm import sessionmaker, declared_attr, declarative_base
-from sqlalchemy.pool import StaticPool, QueuePool
-from typing import Generator, Dict, Any, Optional
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session, sessionmaker, declared_attr, declarative_base
+from sqlalchemy.pool import NullPool, StaticPool, QueuePool
+from sqlalchemy.engine import URL, make_url
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Generator, Dict, Any, Iterator, List, Optional, Set
 import os
-import psycopg2
-from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
+import threading
+import time
 
 
 class DatabaseSettings(ABC):
-    def __init__(self):
+    def __init__(
+        self, database_url: Optional[str] = None, driver: Optional[str] = None
+    ):
         self.BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
         self.DB_DIR = os.path.join(self.BASE_DIR, "database")
         self.ECHO_SQL = os.getenv("ECHO_SQL", "True").lower() == "true"
+        # Explicit DSN, used for tenant databases instead of the env settings
+        self._database_url = database_url
 
     @property
     @abstractmethod
@@ -25,28 +32,53 @@ class DatabaseSettings(ABC):
     def engine_settings(self) -> Dict[str, Any]:
         pass
 
+    @property
+    def read_execution_options(self) -> Dict[str, Any]:
+        """Execution options for read-only sessions."""
+        return {}
+
     @abstractmethod
     def create_database_if_not_exists(self):
         pass
 
 
 class SQLiteSettings(DatabaseSettings):
-    def __init__(self):
-        super().__init__()
-        os.makedirs(self.DB_DIR, exist_ok=True)
-        self._db_file = os.path.join(self.DB_DIR, "app.db")
+    def __init__(
+        self, database_url: Optional[str] = None, driver: Optional[str] = None
+    ):
+        # SQLite has a single driver; `driver` only applies to PostgreSQL
+        super().__init__(database_url)
+        if database_url:
+            self._db_file = make_url(database_url).database or ":memory:"
+            if not self.in_memory:
+                os.makedirs(
+                    os.path.dirname(os.path.abspath(self._db_file)), exist_ok=True
+                )
+        else:
+            os.makedirs(self.DB_DIR, exist_ok=True)
+            self._db_file = os.path.join(self.DB_DIR, "app.db")
 
     @property
     def DATABASE_URL(self) -> str:
-        return f"sqlite:///{self._db_file}"
+        return self._database_url or f"sqlite:///{self._db_file}"
+
+    @property
+    def in_memory(self) -> bool:
+        return self._db_file == ":memory:"
 
     @property
     def engine_settings(self) -> Dict[str, Any]:
-        return {
+        engine_settings = {
             "connect_args": {"check_same_thread": False},
-            "poolclass": StaticPool,
             "echo": self.ECHO_SQL,
         }
+        # A file database gets SQLAlchemy's default QueuePool: StaticPool shares
+        # one DBAPI connection, so a background job returning it to the pool
+        # would roll back a request's uncommitted work. Only an in-memory
+        # database needs the single shared connection.
+        if self.in_memory:
+            engine_settings["poolclass"] = StaticPool
+        return engine_settings
 
     def create_database_if_not_exists(self):
         # SQLite creates database automatically
@@ -54,19 +86,65 @@ class SQLiteSettings(DatabaseSettings):
 
 
 class PostgresSettings(DatabaseSettings):
-    def __init__(self):
-        super().__init__()
-        self.host = os.getenv("POSTGRES_HOST", "49.12.220.213")  # niatakso_db
-        self.port = os.getenv("POSTGRES_PORT", "5432")
-        self.user = os.getenv("POSTGRES_USER", "postgres")
-        self.password = os.getenv("POSTGRES_PASSWORD", "fido&espero&amo")
-        self.database = os.getenv("POSTGRES_DB", "nt_p1")
+    # DB_DRIVER -> (sync dialect, async dialect). asyncpg has no sync DBAPI,
+    # so the sync engine falls back to psycopg2 when it is selected.
+    DRIVERS = {
+        "psycopg2": ("postgresql+psycopg2", None),
+        "psycopg3": ("postgresql+psycopg", "postgresql+psycopg"),
+        "asyncpg": ("postgresql+psycopg2", "postgresql+asyncpg"),
+    }
+
+    def __init__(
+        self, database_url: Optional[str] = None, driver: Optional[str] = None
+    ):
+        super().__init__(database_url)
+        self.driver = (driver or "psycopg2").lower()
+        if self.driver not in self.DRIVERS:
+            raise ValueError(f"Unsupported PostgreSQL driver: {self.driver}")
+        if database_url:
+            url = make_url(database_url)
+            self.host = url.host
+            self.port = str(url.port or 5432)
+            self.user = url.username
+            self.password = url.password
+            self.database = url.database
+        else:
+            self.host = os.getenv("POSTGRES_HOST", "49.12.220.213")  # niatakso_db
+            self.port = os.getenv("POSTGRES_PORT", "5432")
+            self.user = os.getenv("POSTGRES_USER", "postgres")
+            self.password = os.getenv("POSTGRES_PASSWORD", "fido&espero&amo")
+            self.database = os.getenv("POSTGRES_DB", "nt_p1")
         self.pool_size = int(os.getenv("DB_POOL_SIZE", "5"))
         self.max_overflow = int(os.getenv("DB_MAX_OVERFLOW", "10"))
 
+    def _url(self, drivername: str, database: Optional[str] = None) -> str:
+        # DB_DRIVER decides the dialect, also for DSNs that name another one
+        if self._database_url:
+            url = make_url(self._database_url).set(drivername=drivername)
+            if database:
+                url = url.set(database=database)
+        else:
+            url = URL.create(
+                drivername,
+                username=self.user,
+                password=self.password,
+                host=self.host,
+                port=int(self.port),
+                database=database or self.database,
+            )
+        return url.render_as_string(hide_password=False)
+
     @property
     def DATABASE_URL(self) -> str:
-        return f"postgresql://{self.user}:{self.password}@{self.host}:{self.port}/{self.database}"
+        return self._url(self.DRIVERS[self.driver][0])
+
+    @property
+    def ASYNC_DATABASE_URL(self) -> str:
+        """URL for create_async_engine; needs DB_DRIVER psycopg3 or asyncpg."""
+        async_dialect = self.DRIVERS[self.driver][1]
+        if async_dialect is None:
+            raise ValueError(f"Driver {self.driver} has no async support")
+        return self._url(async_dialect)
 
     @property
     def engine_settings(self) -> Dict[str, Any]:
@@ -77,45 +155,94 @@ class PostgresSettings(DatabaseSettings):
             "echo": self.ECHO_SQL,
         }
 
+    @property
+    def read_execution_options(self) -> Dict[str, Any]:
+        # Plain SELECTs need no transaction; avoids BEGIN and ROLLBACK per request
+        return {"isolation_level": "AUTOCOMMIT"}
+
     def create_database_if_not_exists(self):
         """Create PostgreSQL database if it doesn't exist"""
-        # Connection string to connect to PostgreSQL server (not specific database)
-        conn_string = (
-            f"postgresql://{self.user}:{self.password}@{self.host}:{self.port}/postgres"
+        # Connect to the server's maintenance database with the selected driver
+        engine = create_engine(
+            self._url(self.DRIVERS[self.driver][0], database="postgres"),
+            isolation_level="AUTOCOMMIT",
+            poolclass=NullPool,
         )
 
         try:
-            # Connect to default database
-            conn = psycopg2.connect(conn_string)
-            conn.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
-            cursor = conn.cursor()
-
-            # Check if database exists
-            cursor.execute(
-                f"SELECT 1 FROM pg_database WHERE datname = '{self.database}'"
-            )
-            exists = cursor.fetchone()
-
-            if not exists:
-                print(f"Creating database {self.database}")
-                cursor.execute(f"CREATE DATABASE {self.database}")
-                print(f"Database {self.database} created successfully")
-            else:
-                print(f"Database {self.database} already exists")
-
-            cursor.close()
-            conn.close()
+            with engine.connect() as conn:
+                # Check if database exists
+                exists = conn.execute(
+                    text("SELECT 1 FROM pg_database WHERE datname = :name"),
+                    {"name": self.database},
+                ).first()
+
+                if not exists:
+                    print(f"Creating database {self.database}")
+                    quoted = engine.dialect.identifier_preparer.quote(self.database)
+                    conn.execute(text(f"CREATE DATABASE {quoted}"))
+                    print(f"Database {self.database} created successfully")
+                else:
+                    print(f"Database {self.database} already exists")
 
         except Exception as e:
             print(f"Error creating database: {str(e)}")
             raise
+        finally:
+            engine.dispose()
+
+
+class _EngineEntry:
+    """Engine and session factories for one DSN, with its last-use time."""
+
+    __slots__ = (
+        "settings",
+        "engine",
+        "session_maker",
+        "read_session_maker",
+        "last_used",
+    )
+
+    def __init__(
+        self,
+        db_settings: DatabaseSettings,
+        engine_settings: Optional[Dict[str, Any]] = None,
+    ):
+        self.settings = db_settings
+        self.engine = create_engine(
+            db_settings.DATABASE_URL,
+            **(engine_settings or db_settings.engine_settings),
+        )
+        # Write profile: one transaction per request, committed by the unit of
+        # work; nothing is read back after the commit, so skip expiring
+        self.session_maker = sessionmaker(
+            autocommit=False,
+            autoflush=False,
+            expire_on_commit=False,
+            bind=self.engine,
+        )
+        # Read profile: no flushes, no expiry, and no BEGIN/COMMIT round trips
+        # where the backend supports autocommit reads
+        self.read_session_maker = sessionmaker(
+            autoflush=False,
+            expire_on_commit=False,
+            bind=self.engine.execution_options(**db_settings.read_execution_options),
+        )
+        self.last_used = time.monotonic()
 
 
 class DatabaseFactory:
+    """
+    Thread-safe registry of engines keyed by DSN.
+
+    The default engine comes from settings.DB_TYPE and is never evicted.
+    Tenant engines (settings.TENANT_DATABASE_URLS) are created lazily, kept
+    in LRU order, and disposed when evicted or idle, so the number of open
+    pools stays bounded by DB_ENGINE_CACHE_SIZE.
+    """
+
     _instance: Optional["DatabaseFactory"] = None
-    _settings: Optional[DatabaseSettings] = None
-    _engine = None
-    _session_maker = None
+    _instance_lock = threading.Lock()
 
     # Define database settings mapping
     _db_settings_map = {"sqlite": SQLiteSettings, "postgresql": PostgresSettings}
@@ -124,6 +251,20 @@ class DatabaseFactory:
         print("Initializing DatabaseFactory")
         from app.config import settings
 
+        self._tenant_urls: Dict[str, str] = dict(settings.TENANT_DATABASE_URLS)
+        self._driver = settings.DB_DRIVER
+        self._max_engines = max(1, settings.DB_ENGINE_CACHE_SIZE)
+        self._idle_seconds = settings.DB_ENGINE_IDLE_SECONDS
+
+        self._engines: "OrderedDict[str, _EngineEntry]" = OrderedDict()
+        self._lock = threading.RLock()
+        self._build_locks: Dict[str, threading.Lock] = {}
+        # Tenant DSNs whose database and schema were created by this process;
+        # engines rebuilt after eviction or idle disposal skip that work
+        self._initialized: Set[str] = set()
+        self._init_lock = threading.Lock()
+        self._last_sweep = time.monotonic()
+
         db_type = settings.DB_TYPE.lower()
         print(f"Selected database type: {db_type}")
 
@@ -132,41 +273,212 @@ class DatabaseFactory:
         if not settings_class:
             raise ValueError(f"Unsupported database type: {db_type}")
 
-        self._settings = settings_class()
+        self._settings = settings_class(driver=self._driver)
+        if isinstance(self._settings, PostgresSettings) and self._driver == "asyncpg":
+            # The application is synchronous; asyncpg only serves async engines
+            print(
+                "WARNING: DB_DRIVER=asyncpg has no synchronous DBAPI; "
+                "the application engines use psycopg2"
+            )
+        self._default_url = self._settings.DATABASE_URL
         print(f"Using settings class: {type(self._settings).__name__}")
-        print(f"Database URL: {self._settings.DATABASE_URL}")
+        print(f"Database URL: {self._default_url}")
 
         # Create database if it doesn't exist
         self._settings.create_database_if_not_exists()
 
     @classmethod
     def get_instance(cls) -> "DatabaseFactory":
-        if not cls._instance:
-            cls._instance = cls()
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    cls._instance = cls()
         return cls._instance
 
+    @property
+    def db_settings(self) -> DatabaseSettings:
+        """Settings of the default database."""
+        return self._settings
+
     @property
     def engine(self):
-        if self._engine is None:
-            print("Creating new database engine...")
-            self._engine = create_engine(
-                self._settings.DATABASE_URL, **self._settings.engine_settings
-            )
-            print(f"Engine created successfully: {self._engine}")
-        return self._engine
+        return self.get_engine()
 
     @property
     def session_maker(self):
-        if self._session_maker is None:
-            print("Creating new session maker...")
-            self._session_maker = sessionmaker(
-                autocommit=False, autoflush=False, bind=self.engine
-            )
-            print("Session maker created successfully")
-        return self._session_maker
+        return self.get_session_maker()
 
-    def get_db(self) -> Generator:
-        session = self.session_maker()
+    @property
+    def read_session_maker(self):
+        return self.get_read_session_maker()
+
+    def tenant_url(self, tenant_id: Optional[str]) -> str:
+        """Resolve a tenant to its DSN; no tenant means the default database."""
+        if not tenant_id:
+            return self._default_url
+        url = self._tenant_urls.get(tenant_id)
+        if url is None:
+            raise KeyError(f"Unknown tenant: {tenant_id}")
+        return url
+
+    def database_urls(self) -> List[str]:
+        """The default DSN followed by every distinct tenant DSN."""
+        urls = [self._default_url]
+        for url in self._tenant_urls.values():
+            if url not in urls:
+                urls.append(url)
+        return urls
+
+    def get_engine(self, url: Optional[str] = None):
+        return self._get_entry(url or self._default_url).engine
+
+    def get_session_maker(self, url: Optional[str] = None):
+        return self._get_entry(url or self._default_url).session_maker
+
+    def get_read_session_maker(self, url: Optional[str] = None):
+        return self._get_entry(url or self._default_url).read_session_maker
+
+    def _get_entry(self, url: str) -> _EngineEntry:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._engines.get(url)
+            if entry is not None:
+                entry.last_used = now
+                self._engines.move_to_end(url)
+                if now - self._last_sweep > self._idle_seconds:
+                    self._last_sweep = now
+                    self._dispose_idle_locked(now)
+                return entry
+            build_lock = self._build_locks.setdefault(url, threading.Lock())
+
+        # Build outside the registry lock so a slow database does not block
+        # lookups of other engines; the per-DSN lock prevents duplicates
+        with build_lock:
+            with self._lock:
+                entry = self._engines.get(url)
+                if entry is not None:
+                    return entry
+
+            entry = self._build_entry(url)
+
+            with self._lock:
+                self._engines[url] = entry
+                self._build_locks.pop(url, None)
+                self._evict_locked()
+            return entry
+
+    @contextmanager
+    def maintenance_session(
+        self, url: Optional[str] = None, read: bool = False
+    ) -> Iterator[Session]:
+        """
+        Session for background jobs that must not reshape the engine cache.
+
+        A cached engine is used as is, without promoting it in the LRU order;
+        otherwise a short-lived NullPool engine is built outside the registry
+        and disposed afterwards, so no request engine gets evicted.
+        """
+        url = url or self._default_url
+        with self._lock:
+            entry = self._engines.get(url)
+        owned = entry is None
+        if owned:
+            db_settings = self._settings_for(url)
+            engine_settings = {
+                key: value
+                for key, value in db_settings.engine_settings.items()
+                if key not in ("poolclass", "pool_size", "max_overflow")
+            }
+            engine_settings["poolclass"] = NullPool
+            entry = _EngineEntry(db_settings, engine_settings)
+        try:
+            if owned:
+                self._initialize(url, entry.settings, entry.engine)
+            maker = entry.read_session_maker if read else entry.session_maker
+            with maker() as session:
+                yield session
+        finally:
+            if owned:
+                entry.engine.dispose()
+
+    def _settings_for(self, url: str) -> DatabaseSettings:
+        if url == self._default_url:
+            return self._settings
+        backend = make_url(url).get_backend_name()
+        settings_class = self._db_settings_map.get(backend)
+        if not settings_class:
+            raise ValueError(f"Unsupported database type: {backend}")
+        return settings_class(url, driver=self._driver)
+
+    def _initialize(self, url: str, db_settings: DatabaseSettings, engine):
+        """Create a tenant database and its schema, once per process."""
+        if url == self._default_url or url in self._initialized:
+            return
+        with self._init_lock:
+            if url in self._initialized:
+                return
+            db_settings.create_database_if_not_exists()
+            # Tenant databases get the schema on first use
+            Base.metadata.create_all(bind=engine)
+            self._initialized.add(url)
+
+    def _build_entry(self, url: str) -> _EngineEntry:
+        db_settings = self._settings_for(url)
+        print(f"Creating new database engine for {type(db_settings).__name__}...")
+        entry = _EngineEntry(db_settings)
+        print(f"Engine created successfully: {entry.engine}")
+        try:
+            self._initialize(url, db_settings, entry.engine)
+        except Exception:
+            entry.engine.dispose()
+            raise
+        return entry
+
+    def _evict_locked(self):
+        while len(self._engines) > self._max_engines:
+            url = next((u for u in self._engines if u != self._default_url), None)
+            if url is None:
+                break
+            self._dispose_entry(self._engines.pop(url))
+
+    def _dispose_idle_locked(self, now: float) -> int:
+        idle = [
+            url
+            for url, entry in self._engines.items()
+            if url != self._default_url and now - entry.last_used > self._idle_seconds
+        ]
+        for url in idle:
+            self._dispose_entry(self._engines.pop(url))
+        return len(idle)
+
+    @staticmethod
+    def _dispose_entry(entry: _EngineEntry):
+        print(f"Disposing database engine: {entry.engine}")
+        entry.engine.dispose()
+
+    def dispose_idle(self) -> int:
+        """Dispose tenant engines unused for DB_ENGINE_IDLE_SECONDS."""
+        with self._lock:
+            now = time.monotonic()
+            self._last_sweep = now
+            return self._dispose_idle_locked(now)
+
+    def dispose_all(self):
+        """Dispose every engine, e.g. on application shutdown."""
+        with self._lock:
+            while self._engines:
+                _, entry = self._engines.popitem()
+                self._dispose_entry(entry)
+
+    def get_db(self, tenant_id: Optional[str] = None) -> Generator:
+        session = self.get_session_maker(self.tenant_url(tenant_id))()
+        try:
+            yield session
+        finally:
+            session.close()
+
+    def get_read_db(self, tenant_id: Optional[str] = None) -> Generator:
+        session = self.get_read_session_maker(self.tenant_url(tenant_id))()
         try:
             yield session
         finally:
@@ -188,8 +500,8 @@ def get_db() -> Generator:
 
 def verify_database() -> bool:
     try:
-        db = next(get_db())
-        db.execute(text("SELECT 1"))
+        with DatabaseFactory.get_instance().engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
         return True
     except Exception as e:
         print(f"Database connection failed: {str(e)}")
@@ -219,7 +531,11 @@ def init_database():
     print("\nAttempting to create tables...")
     Base.metadata.create_all(bind=factory.engine)
 
-    # Verify tables after creation
-    inspector = inspect(factory.engine)
-    actual_tables = inspector.get_table_names()
-    print(f"\nActual tables in database after creation: {actual_tables}")
+    # Verify tables after creation; the snapshot is reused by later checks
+    from app.db.schema import schema_cache
+
+    snapshot = schema_cache.refresh(factory.engine)
+    print(f"\nActual tables in database after creation: {snapshot.table_names}")
+    drift = schema_cache.drift(Base.metadata)
+    if drift.has_drift:
+        print(f"Schema drift detected: {drift.as_dict()}")
@@ -0,0 +1,13 @@
+# app/db/enums/enums_audit.py
+from enum import Enum
+
+
+class AuthEventType(str, Enum):
+    LOGIN_SUCCESS = "login_success"
+    LOGIN_FAILURE = "login_failure"
+    REGISTER = "register"
+
+
+class AuditOverflowPolicy(str, Enum):
+    DROP_OLDEST = "drop_oldest"
+    SPILL = "spill"
@@ -0,0 +1,31 @@
+# app/db/models/models_audit.py
+from sqlalchemy import BigInteger, Column, DateTime, Enum, Integer, String
+from app.db.database import Base
+from app.db.enums.enums_audit import AuthEventType
+
+
+class AuthEvent(Base):
+    """
+    Append-only audit record of an authentication event.
+    Rows are only ever inserted, in batches, by the audit writer.
+    """
+
+    __tablename__ = "auth_events"
+
+    # SQLite only autoincrements INTEGER primary keys
+    id = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True)
+
+    # Generated when the event happens; makes spill-file replays idempotent
+    event_id = Column(String(32), unique=True, nullable=False)
+    event_type = Column(Enum(AuthEventType), index=True, nullable=False)
+
+    # No foreign key: audit rows must outlive the users they mention
+    user_id = Column(Integer, index=True)
+    login = Column(String(255))
+    reason = Column(String(50))
+    tenant_id = Column(String(64))
+    ip_address = Column(String(45))
+    user_agent = Column(String(255))
+
+    # When the event happened, not when the batch was written
+    occurred_at = Column(DateTime(timezone=True), index=True, nullable=False)
@@ -0,0 +1,46 @@
+# app/db/models/models_session.py
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from datetime import datetime, timezone
+from app.db.database import Base
+
+
+class UserSession(Base):
+    __tablename__ = "user_sessions"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(
+        Integer, ForeignKey("users.id", ondelete="CASCADE"), index=True, nullable=False
+    )
+
+    # HMAC-SHA256 of the refresh token; the raw token is never stored
+    token_hash = Column(String(64), unique=True, index=True, nullable=False)
+
+    created_at = Column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
+        nullable=False,
+    )
+    expires_at = Column(DateTime(timezone=True), index=True, nullable=False)
+    revoked_at = Column(DateTime(timezone=True))
+
+    # Session that superseded this one on rotation
+    replaced_by_id = Column(Integer)
+
+    @property
+    def is_revoked(self) -> bool:
+        """Check if the session was revoked or rotated away."""
+        return self.revoked_at is not None
+
+    @property
+    def is_expired(self) -> bool:
+        """Check if the session is past its expiry timestamp."""
+        expires_at = self.expires_at
+        if expires_at.tzinfo is None:
+            # SQLite drops tzinfo; values are always stored as UTC
+            expires_at = expires_at.replace(tzinfo=timezone.utc)
+        return datetime.now(timezone.utc) >= expires_at
+
+    def revoke(self, replaced_by_id: int = None) -> None:
+        """Revoke the session, optionally recording its rotated successor."""
+        self.revoked_at = datetime.now(timezone.utc)
+        self.replaced_by_id = replaced_by_id
@@ -0,0 +1,23 @@
+# app/db/models/models_stats.py
+from sqlalchemy import Column, Integer, String, DateTime
+from datetime import datetime, timezone
+from app.db.database import Base
+
+
+class UserStat(Base):
+    """
+    Pre-aggregated user counters, one row per (metric, bucket).
+    e.g. ("role", "admin"), ("status", "active"), ("signups", "2024-11-30").
+    """
+
+    __tablename__ = "user_stats"
+
+    metric = Column(String(32), primary_key=True)
+    bucket = Column(String(32), primary_key=True)
+    value = Column(Integer, nullable=False, default=0)
+    updated_at = Column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
+        onupdate=lambda: datetime.now(timezone.utc),
+        nullable=False,
+    )
@@ -0,0 +1,30 @@
+# app/db/pipeline.py
+from contextlib import contextmanager
+from typing import Iterator
+
+from sqlalchemy.orm import Session
+
+
+def supports_pipeline(db: Session) -> bool:
+    """True when the session's database is PostgreSQL through psycopg 3."""
+    bind = db.get_bind()
+    return bind.dialect.name == "postgresql" and bind.dialect.driver == "psycopg"
+
+
+@contextmanager
+def pipeline(db: Session) -> Iterator[None]:
+    """
+    Run the block's statements in psycopg 3 pipeline mode: statements are
+    sent without waiting for each result, and the block costs one round
+    trip when it ends instead of one per statement. Reading a result inside
+    the block (SELECT, RETURNING) forces an early sync, so use it for runs
+    of independent writes. A no-op with other drivers.
+
+    The block must end before the session commits, because the commit
+    hands the connection back to the pool.
+    """
+    if not supports_pipeline(db):
+        yield
+        return
+    with db.connection().connection.driver_connection.pipeline():
+        yield
@@ -0,0 +1,98 @@
+# app/db/repositories/repository_audit.py
+from typing import Any, Dict, Sequence
+
+from sqlalchemy import Connection
+from sqlalchemy.dialects import postgresql, sqlite
+
+from app.db.models.models_audit import AuthEvent
+
+auth_events = AuthEvent.__table__
+
+# Smallest batch worth the extra staging statements of a COPY
+COPY_MIN_ROWS = 50
+
+_COPY_COLUMNS = (
+    "event_id",
+    "event_type",
+    "user_id",
+    "login",
+    "reason",
+    "tenant_id",
+    "ip_address",
+    "user_agent",
+    "occurred_at",
+)
+_COPY_TYPES = (
+    "text",
+    "text",
+    "int4",
+    "text",
+    "text",
+    "text",
+    "text",
+    "text",
+    "timestamptz",
+)
+
+
+class AuditRepository:
+    """Bulk writes of audit events."""
+
+    __slots__ = ("conn",)
+
+    def __init__(self, conn: Connection):
+        self.conn = conn
+
+    def insert_many(self, rows: Sequence[Dict[str, Any]]) -> int:
+        """
+        Insert a batch of events in one executemany. Events already stored
+        (same event_id, e.g. a replayed spill file) are skipped.
+        Returns the number of events submitted.
+        """
+        if not rows:
+            return 0
+        if len(rows) >= COPY_MIN_ROWS and self._is_psycopg3():
+            return self._copy_many(rows)
+        dialect = postgresql if self.conn.dialect.name == "postgresql" else sqlite
+        stmt = dialect.insert(auth_events).on_conflict_do_nothing(
+            index_elements=[auth_events.c.event_id]
+        )
+        self.conn.execute(stmt, list(rows))
+        return len(rows)
+
+    def _is_psycopg3(self) -> bool:
+        dialect = self.conn.dialect
+        return dialect.name == "postgresql" and dialect.driver == "psycopg"
+
+    def _copy_many(self, rows: Sequence[Dict[str, Any]]) -> int:
+        """
+        psycopg 3 path: binary COPY into a transaction-local staging table,
+        then one INSERT ... SELECT that skips known event_ids, since COPY
+        itself cannot handle conflicts.
+        """
+        columns = ", ".join(_COPY_COLUMNS)
+        enum_type = auth_events.c.event_type.type.name
+        with self.conn.connection.driver_connection.cursor() as cursor:
+            cursor.execute(
+                "CREATE TEMP TABLE IF NOT EXISTS _auth_events_stage ("
+                "event_id text, event_type text, user_id int4, login text, "
+                "reason text, tenant_id text, ip_address text, user_agent text, "
+                "occurred_at timestamptz) ON COMMIT DELETE ROWS"
+            )
+            with cursor.copy(
+                f"COPY _auth_events_stage ({columns}) FROM STDIN (FORMAT BINARY)"
+            ) as copy:
+                copy.set_types(_COPY_TYPES)
+                for row in rows:
+                    copy.write_row(
+                        # SQLAlchemy stores enum names, not values
+                        (row["event_id"], row["event_type"].name)
+                        + tuple(row[column] for column in _COPY_COLUMNS[2:])
+                    )
+            cursor.execute(
+                f"INSERT INTO auth_events ({columns}) "
+                f"SELECT event_id, event_type::{enum_type}, user_id, login, reason, "
+                f"tenant_id, ip_address, user_agent, occurred_at "
+                f"FROM _auth_events_stage ON CONFLICT (event_id) DO NOTHING"
+            )
+        return len(rows)
@@ -0,0 +1,199 @@
+# app/db/repositories/repository_stats.py
+from collections import Counter
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, Mapping, Optional, Tuple, Union
+
+from sqlalchemy import Connection, bindparam, delete, func, or_, select, text
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.db.models.models_stats import UserStat
+from app.db.models.models_user import User
+
+user_stats = UserStat.__table__
+users = User.__table__
+
+# Metric names
+TOTAL = "total"
+ROLE = "role"
+STATUS = "status"
+ACTIVE = "is_active"
+SIGNUPS = "signups"
+LAST_LOGIN_DAY = "last_login_day"
+
+DAILY_METRICS = (SIGNUPS, LAST_LOGIN_DAY)
+
+StatKey = Tuple[str, str]
+
+_SUMMARY = select(user_stats.c.metric, user_stats.c.bucket, user_stats.c.value).where(
+    or_(
+        user_stats.c.metric.in_((TOTAL, ROLE, STATUS, ACTIVE)),
+        user_stats.c.bucket >= bindparam("cutoff"),
+    )
+)
+
+
+def day_bucket(value: Union[datetime, date, None]) -> Optional[str]:
+    """UTC day of a timestamp as YYYY-MM-DD; naive values are taken as UTC."""
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        if value.tzinfo is not None:
+            value = value.astimezone(timezone.utc)
+        value = value.date()
+    return value.isoformat()
+
+
+def daily_cutoff(days: int) -> str:
+    """First day bucket inside a window of `days` days ending today."""
+    return (datetime.now(timezone.utc).date() - timedelta(days=days - 1)).isoformat()
+
+
+def user_stat_keys(
+    role: Any,
+    status: Any,
+    is_active: Any,
+    created_at: Optional[datetime],
+    last_login: Optional[datetime],
+) -> Counter:
+    """Counter contributions of one user row."""
+    keys = Counter({(TOTAL, "all"): 1})
+    keys[(ROLE, getattr(role, "value", role))] += 1
+    keys[(STATUS, getattr(status, "value", status))] += 1
+    keys[(ACTIVE, "true" if is_active else "false")] += 1
+    if created_at is not None:
+        keys[(SIGNUPS, day_bucket(created_at))] += 1
+    if last_login is not None:
+        keys[(LAST_LOGIN_DAY, day_bucket(last_login))] += 1
+    return keys
+
+
+class UserStatsRepository:
+    """Incremental counters for the admin dashboard, kept in user_stats."""
+
+    __slots__ = ("db",)
+
+    def __init__(self, db: Union[Session, Connection]):
+        self.db = db
+
+    @property
+    def _dialect_name(self) -> str:
+        if isinstance(self.db, Connection):
+            return self.db.dialect.name
+        return self.db.get_bind().dialect.name
+
+    def apply(self, deltas: Mapping[StatKey, int]):
+        """
+        Add deltas to the counters with a single upsert.
+        Daily buckets outside the retention window are ignored; they have
+        been pruned by reconciliation and must not come back as negatives.
+        """
+        cutoff = daily_cutoff(settings.USER_STATS_DAILY_RETENTION_DAYS)
+        rows = [
+            {"metric": metric, "bucket": bucket, "value": delta}
+            for (metric, bucket), delta in sorted(deltas.items())
+            if delta and not (metric in DAILY_METRICS and bucket < cutoff)
+        ]
+        if not rows:
+            return
+
+        # Sorted keys keep lock order stable across concurrent transactions
+        dialect = postgresql if self._dialect_name == "postgresql" else sqlite
+        stmt = dialect.insert(user_stats).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[user_stats.c.metric, user_stats.c.bucket],
+            set_={
+                "value": user_stats.c.value + stmt.excluded.value,
+                "updated_at": datetime.now(timezone.utc),
+            },
+        )
+        self.db.execute(stmt)
+
+    def record_login(self, previous: Optional[datetime], current: datetime):
+        """Move a user from the day of their previous login to today."""
+        old, new = day_bucket(previous), day_bucket(current)
+        if old == new:
+            return
+        deltas = Counter({(LAST_LOGIN_DAY, new): 1})
+        if old is not None:
+            deltas[(LAST_LOGIN_DAY, old)] -= 1
+        self.apply(deltas)
+
+    def summary(self, days: int = 30) -> Dict[str, Any]:
+        """
+        Dashboard aggregates read from the bounded counter rows only.
+        Recent activity is counted per UTC day, like is_recently_active.
+        """
+        days = max(1, min(days, settings.USER_STATS_DAILY_RETENTION_DAYS))
+        cutoff = daily_cutoff(days)
+        active_cutoff = daily_cutoff(30)
+
+        result: Dict[str, Any] = {
+            "total": 0,
+            "by_role": {},
+            "by_status": {},
+            "by_active": {},
+            "active_last_30_days": 0,
+            "daily_signups": {},
+        }
+        rows = self.db.execute(_SUMMARY, {"cutoff": min(cutoff, active_cutoff)})
+        for metric, bucket, value in rows:
+            if metric == TOTAL:
+                result["total"] = value
+            elif metric == ROLE:
+                result["by_role"][bucket] = value
+            elif metric == STATUS:
+                result["by_status"][bucket] = value
+            elif metric == ACTIVE:
+                result["by_active"][bucket] = value
+            elif metric == LAST_LOGIN_DAY and bucket >= active_cutoff:
+                result["active_last_30_days"] += value
+            elif metric == SIGNUPS and bucket >= cutoff and value:
+                result["daily_signups"][bucket] = value
+        result["daily_signups"] = dict(sorted(result["daily_signups"].items()))
+        return result
+
+    def reconcile(self) -> int:
+        """
+        Recompute every counter from the users table and replace user_stats.
+        The counter table is locked first, so concurrent registrations wait
+        and then apply their increments on top of the recomputed values.
+        Returns the number of counter rows written. The caller commits.
+        """
+        if self._dialect_name == "postgresql":
+            self.db.execute(text("LOCK TABLE user_stats IN SHARE ROW EXCLUSIVE MODE"))
+        # On SQLite the DELETE takes the database write lock
+        self.db.execute(delete(user_stats))
+
+        counts: Counter = Counter()
+        total = self.db.execute(select(func.count()).select_from(users)).scalar()
+        counts[(TOTAL, "all")] = total or 0
+        for metric, column in ((ROLE, users.c.role), (STATUS, users.c.status)):
+            for value, count in self.db.execute(
+                select(column, func.count()).group_by(column)
+            ):
+                counts[(metric, getattr(value, "value", value))] = count
+        for value, count in self.db.execute(
+            select(users.c.is_active, func.count()).group_by(users.c.is_active)
+        ):
+            counts[(ACTIVE, "true" if value else "false")] = count
+
+        # Daily buckets inside the retention window, bucketed in Python so
+        # day boundaries are UTC on every backend
+        since = datetime.now(timezone.utc) - timedelta(
+            days=settings.USER_STATS_DAILY_RETENTION_DAYS
+        )
+        recent = self.db.execute(
+            select(users.c.created_at, users.c.last_login).where(
+                or_(users.c.created_at >= since, users.c.last_login >= since)
+            )
+        )
+        for created_at, last_login in recent:
+            if created_at is not None:
+                counts[(SIGNUPS, day_bucket(created_at))] += 1
+            if last_login is not None:
+                counts[(LAST_LOGIN_DAY, day_bucket(last_login))] += 1
+
+        self.apply(counts)
+        return len(counts)
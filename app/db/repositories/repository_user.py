@@ -0,0 +1,123 @@
+# app/db/repositories/repository_user.py
+from datetime import datetime, timezone
+from typing import Optional
+from sqlalchemy import Row, bindparam, literal, or_, select, update
+from sqlalchemy.orm import Session
+
+from app.db.models.models_user import User
+from app.schemas.schemas_principal import UserPrincipal
+
+users = User.__table__
+
+# Statements are built once at import time and only take bound parameters.
+# SQLAlchemy memoizes the cache key of an immutable statement, so each call
+# skips statement construction and hits the engine's compiled cache. Selecting
+# table columns (not the mapped class) returns plain Row tuples and bypasses
+# ORM entity loading and the identity map.
+
+_AUTH_BY_LOGIN = (
+    select(
+        users.c.id,
+        users.c.email,
+        users.c.username,
+        users.c.hashed_password,
+        users.c.role,
+        users.c.status,
+        users.c.is_active,
+        users.c.last_login,
+    )
+    .where(
+        or_(
+            users.c.email == bindparam("login"),
+            users.c.username == bindparam("login"),
+        )
+    )
+    .limit(1)
+)
+
+# Columns of UserPrincipal
+_BY_EMAIL = select(
+    users.c.id,
+    users.c.email,
+    users.c.username,
+    users.c.first_name,
+    users.c.last_name,
+    users.c.role,
+    users.c.status,
+    users.c.is_active,
+    users.c.updated_at,
+).where(users.c.email == bindparam("email"))
+
+_EMAIL_EXISTS = select(literal(1)).where(users.c.email == bindparam("email")).limit(1)
+
+_USERNAME_EXISTS = (
+    select(literal(1)).where(users.c.username == bindparam("username")).limit(1)
+)
+
+_REGISTRATION_CONFLICTS = (
+    select(users.c.email, users.c.username)
+    .where(
+        or_(
+            users.c.email == bindparam("email"),
+            users.c.username == bindparam("username"),
+        )
+    )
+    .limit(2)
+)
+
+_TOUCH_LAST_LOGIN = (
+    update(users)
+    .where(users.c.id == bindparam("user_id"))
+    .values(last_login=bindparam("last_login"))
+)
+
+
+class UserRepository:
+    """Column-level queries for the hot user lookups."""
+
+    __slots__ = ("db",)
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get_auth_by_login(self, login: str) -> Optional[Row]:
+        """Credentials and status of a user identified by email or username."""
+        return self.db.execute(_AUTH_BY_LOGIN, {"login": login}).first()
+
+    def get_by_email(self, email: str) -> Optional[Row]:
+        return self.db.execute(_BY_EMAIL, {"email": email}).first()
+
+    def get_principal_by_email(self, email: str) -> Optional[UserPrincipal]:
+        row = self.get_by_email(email)
+        return UserPrincipal.from_row(row) if row else None
+
+    def email_exists(self, email: str) -> bool:
+        return self.db.execute(_EMAIL_EXISTS, {"email": email}).first() is not None
+
+    def username_exists(self, username: str) -> bool:
+        return (
+            self.db.execute(_USERNAME_EXISTS, {"username": username}).first()
+            is not None
+        )
+
+    def find_registration_conflict(self, email: str, username: str) -> Optional[str]:
+        """
+        Check email and username uniqueness in one round trip.
+        Returns "email" or "username" for the first conflict, email first.
+        """
+        rows = self.db.execute(
+            _REGISTRATION_CONFLICTS, {"email": email, "username": username}
+        ).all()
+        if any(row.email == email for row in rows):
+            return "email"
+        if rows:
+            return "username"
+        return None
+
+    def touch_last_login(
+        self, user_id: int, when: Optional[datetime] = None
+    ) -> datetime:
+        """Set last_login without loading the user. Returns the timestamp."""
+        when = when or datetime.now(timezone.utc)
+        self.db.execute(_TOUCH_LAST_LOGIN, {"user_id": user_id, "last_login": when})
+        return when
@@ -0,0 +1,137 @@
+# app/db/schema.py
+import hashlib
+import json
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import Engine, MetaData, inspect
+
+
+@dataclass(frozen=True)
+class SchemaSnapshot:
+    """Reflected tables and columns of a database at one point in time."""
+
+    tables: Dict[str, List[Dict[str, Any]]]
+    fingerprint: str
+    version: int
+    reflected_at: float
+    dialect: str
+
+    @property
+    def table_names(self) -> List[str]:
+        return list(self.tables)
+
+
+@dataclass(frozen=True)
+class SchemaDrift:
+    """
+    Differences between the ORM metadata and the reflected database.
+    Only missing tables or columns count as drift; extra ones may belong
+    to other applications or to pending migrations.
+    """
+
+    missing_tables: List[str] = field(default_factory=list)
+    extra_tables: List[str] = field(default_factory=list)
+    missing_columns: Dict[str, List[str]] = field(default_factory=dict)
+    extra_columns: Dict[str, List[str]] = field(default_factory=dict)
+
+    @property
+    def has_drift(self) -> bool:
+        return bool(self.missing_tables or self.missing_columns)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "has_drift": self.has_drift,
+            "missing_tables": self.missing_tables,
+            "extra_tables": self.extra_tables,
+            "missing_columns": self.missing_columns,
+            "extra_columns": self.extra_columns,
+        }
+
+
+def _fingerprint(tables: Dict[str, List[Dict[str, Any]]]) -> str:
+    return hashlib.sha256(json.dumps(tables, sort_keys=True).encode()).hexdigest()
+
+
+class SchemaCache:
+    """
+    In-memory snapshot of the database schema, reflected once and then
+    refreshed on startup, on a schedule or on demand. Readers get the
+    current snapshot without any catalog queries.
+    """
+
+    def __init__(self):
+        self._snapshot: Optional[SchemaSnapshot] = None
+        self._lock = threading.Lock()
+
+    @property
+    def snapshot(self) -> Optional[SchemaSnapshot]:
+        return self._snapshot
+
+    def refresh(self, engine: Engine) -> SchemaSnapshot:
+        """
+        Reflect all tables with one inspector. get_multi_columns batches
+        the column lookups into a single catalog query per kind on dialects
+        that support it, instead of one query per table.
+        """
+        with self._lock:
+            inspector = inspect(engine)
+            tables: Dict[str, List[Dict[str, Any]]] = {
+                name: [] for name in sorted(inspector.get_table_names())
+            }
+            for (_, table), columns in inspector.get_multi_columns().items():
+                if table in tables:
+                    tables[table] = [
+                        {
+                            "name": col["name"],
+                            "type": str(col["type"]),
+                            "nullable": bool(col.get("nullable", True)),
+                        }
+                        for col in columns
+                    ]
+
+            fingerprint = _fingerprint(tables)
+            previous = self._snapshot
+            if previous is not None and previous.fingerprint == fingerprint:
+                version = previous.version
+            else:
+                version = (previous.version if previous else 0) + 1
+            self._snapshot = SchemaSnapshot(
+                tables=tables,
+                fingerprint=fingerprint,
+                version=version,
+                reflected_at=time.time(),
+                dialect=engine.dialect.name,
+            )
+            return self._snapshot
+
+    def drift(self, metadata: MetaData) -> Optional[SchemaDrift]:
+        """Compare the metadata against the current snapshot; None if not reflected yet."""
+        snapshot = self._snapshot
+        if snapshot is None:
+            return None
+
+        missing_columns: Dict[str, List[str]] = {}
+        extra_columns: Dict[str, List[str]] = {}
+        for name, table in metadata.tables.items():
+            reflected = snapshot.tables.get(name)
+            if reflected is None:
+                continue
+            expected = {column.name for column in table.columns}
+            actual = {column["name"] for column in reflected}
+            if expected - actual:
+                missing_columns[name] = sorted(expected - actual)
+            if actual - expected:
+                extra_columns[name] = sorted(actual - expected)
+
+        return SchemaDrift(
+            missing_tables=sorted(set(metadata.tables) - set(snapshot.tables)),
+            extra_tables=sorted(set(snapshot.tables) - set(metadata.tables)),
+            missing_columns=missing_columns,
+            extra_columns=extra_columns,
+        )
+
+
+schema_cache = SchemaCache()
@@ -1,13 +1,61 @@
 # app/db/session.py
 from typing import Generator
+from fastapi import HTTPException, Request, status
 from sqlalchemy.orm import Session
+from app.config import settings
 from app.db.database import DatabaseFactory, verify_database
 
 
-# Re-export the get_db function from database.py
-def get_db() -> Generator[Session, None, None]:
-    yield from DatabaseFactory.get_instance().get_db()
+def get_tenant_id(request: Request) -> str:
+    """Tenant selected by the request header; empty means the default database."""
+    return request.headers.get(settings.TENANT_HEADER, "")
+
+
+def _resolve_tenant_url(request: Request) -> str:
+    try:
+        return DatabaseFactory.get_instance().tenant_url(get_tenant_id(request))
+    except KeyError:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Unknown tenant"
+        )
+
+
+def get_db(request: Request) -> Generator[Session, None, None]:
+    """
+    Write session for the request tenant.
+    Shared by every dependency of the request and committed once by
+    UnitOfWorkMiddleware; routes should flush, not commit.
+    """
+    session_maker = DatabaseFactory.get_instance().get_session_maker(
+        _resolve_tenant_url(request)
+    )
+    uow = getattr(request.state, "unit_of_work", None)
+    if uow is not None:
+        yield uow.get_session(session_maker)
+        return
+
+    # No middleware installed: manage the transaction here
+    session = session_maker()
+    try:
+        yield session
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        session.close()
+
+
+def get_read_db(request: Request) -> Generator[Session, None, None]:
+    """Read-only session for the request tenant; never commits."""
+    session = DatabaseFactory.get_instance().get_read_session_maker(
+        _resolve_tenant_url(request)
+    )()
+    try:
+        yield session
+    finally:
+        session.close()
 
 
 # Re-export verify_database function
-__all__ = ["get_db", "verify_database"]
+__all__ = ["get_db", "get_read_db", "get_tenant_id", "verify_database"]
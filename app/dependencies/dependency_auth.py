@@ -1,36 +1,14 @@
 # app/dependencies/auth.py
 from fastapi import Depends, HTTPException, status
-from sqlalchemy.orm import Session
 
-from app.db.session import get_db
-from app.db.models.models_user import User
-from app.utils.utils_auth import verify_token, oauth2_scheme
+from app.schemas.schemas_principal import UserPrincipal
+from app.utils.utils_auth import get_current_user
 from app.db.enums.enums_user import UserRole
 
 
-async def get_current_user(
-    token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)
-) -> User:
-    """Get current user from JWT token."""
-    payload = verify_token(token)
-    email = payload.get("sub")
-    if email is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Could not validate credentials",
-        )
-
-    user = db.query(User).filter(User.email == email).first()
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found"
-        )
-    return user
-
-
 async def get_current_active_user(
-    current_user: User = Depends(get_current_user),
-) -> User:
+    current_user: UserPrincipal = Depends(get_current_user),
+) -> UserPrincipal:
     """Check if current user is active."""
     if not current_user.is_active:
         raise HTTPException(
@@ -39,10 +17,16 @@ async def get_current_active_user(
     return current_user
 
 
-def check_admin_access(current_user: User = Depends(get_current_active_user)) -> User:
+def check_admin_access(
+    current_user: UserPrincipal = Depends(get_current_active_user),
+) -> UserPrincipal:
     """Check if current user has admin role."""
     if current_user.role != UserRole.ADMIN:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN, detail="Not enough permissions"
         )
     return current_user
+
+
+# get_current_user lives in utils_auth; re-exported for existing imports
+__all__ = ["get_current_user", "get_current_active_user", "check_admin_access"]
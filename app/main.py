@@ -1,10 +1,29 @@
 # app/main.py
+import asyncio
 from contextlib import asynccontextmanager
-from fastapi import FastAPI
+from fastapi import FastAPI, Request, Response
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from app.config import settings
-from app.routes import routes_auth, routes_user
+from app.routes import routes_auth, routes_user, routes_admin, routes_health
 from app.db.database import verify_database, init_database, Base, DatabaseFactory
+from app.middleware.middleware_unit_of_work import UnitOfWorkMiddleware
+from app.middleware.middleware_profiling import ProfilingMiddleware
+from app.tasks.tasks_maintenance import (
+    create_scheduler,
+    seed_user_stats,
+    rebuild_availability_index_job,
+    refresh_schema_snapshot_job,
+)
+from app.tasks.tasks_audit import AuditWriter, replay_spill_file
+from app.utils.utils_audit import audit_queue
+from app.utils.utils_health import database_health, prewarm_pool
+from app.utils.utils_http_cache import (
+    conditional_headers,
+    etag_matches,
+    not_modified,
+    payload_etag,
+)
 
 
 @asynccontextmanager
@@ -12,6 +31,8 @@ async def lifespan(app: FastAPI):
     """
     Lifespan context manager for startup and shutdown events
     """
+    scheduler = None
+    audit_writer = None
     try:
         print("Starting application initialization...")
 
@@ -26,15 +47,68 @@ async def lifespan(app: FastAPI):
         Base.metadata.create_all(bind=db_factory.engine)
         print("Database tables created successfully")
 
+        # Reflect once; debug and drift checks read this snapshot
+        fingerprint = await asyncio.to_thread(refresh_schema_snapshot_job)
+        print(f"Schema snapshot {fingerprint[:12]} taken")
+        try:
+            await asyncio.to_thread(seed_user_stats)
+        except Exception as e:
+            # A tenant database may be down; the reconcile job seeds it later
+            print(f"User stats seeding incomplete: {type(e).__name__}: {e}")
+
+        # Username/email availability filter, built before serving traffic
+        indexed = await asyncio.to_thread(rebuild_availability_index_job)
+        print(f"Availability index built from {indexed} users")
+
+        # Open the pool's connections before reporting ready
+        if settings.POOL_PREWARM:
+            warmed = await asyncio.to_thread(prewarm_pool, db_factory.engine)
+            print(f"Connection pool pre-warmed with {warmed} connections")
+
         # Include routers
         app.include_router(routes_auth.router, prefix=settings.API_V1_PREFIX)
         app.include_router(routes_user.router, prefix=settings.API_V1_PREFIX)
+        app.include_router(routes_admin.router, prefix=settings.API_V1_PREFIX)
         print("Routers included successfully")
 
+        # Audit events buffered in memory and written in batches
+        if settings.AUDIT_ENABLED:
+            try:
+                replayed = await asyncio.to_thread(
+                    replay_spill_file, audit_queue.spill_file, settings.AUDIT_BATCH_SIZE
+                )
+            except Exception as e:
+                # Left on disk and retried at the next start; never blocks startup
+                replayed = 0
+                print(f"Audit spill replay failed: {type(e).__name__}: {e}")
+            if replayed:
+                print(f"Replayed {replayed} spilled audit events")
+            audit_writer = AuditWriter(
+                audit_queue,
+                settings.AUDIT_BATCH_SIZE,
+                settings.AUDIT_FLUSH_INTERVAL_SECONDS,
+            )
+            await audit_writer.start()
+
+        # Background maintenance, kept off the request path; the readiness
+        # ping runs even when SCHEDULER_ENABLED turns maintenance off
+        scheduler = create_scheduler(maintenance=settings.SCHEDULER_ENABLED)
+        await scheduler.start()
+        app.state.scheduler = scheduler
+
+        await asyncio.to_thread(database_health.ping, db_factory.engine)
+        database_health.warmed = True
+
         yield
     finally:
         print("Shutting down application...")
-        pass
+        database_health.warmed = False
+        if scheduler is not None:
+            await scheduler.stop()
+        if audit_writer is not None:
+            await audit_writer.stop()
+        if DatabaseFactory._instance is not None:
+            DatabaseFactory.get_instance().dispose_all()
 
 
 def create_application() -> FastAPI:
@@ -45,6 +119,16 @@ def create_application() -> FastAPI:
         lifespan=lifespan,
     )
 
+    # Probes are served before the API routers are mounted
+    application.include_router(routes_health.router)
+
+    # One commit per request for write sessions
+    application.add_middleware(UnitOfWorkMiddleware)
+
+    # Opt-in request profiling; not installed at all when disabled
+    if settings.PROFILING_ENABLED:
+        application.add_middleware(ProfilingMiddleware)
+
     # Set up CORS
     application.add_middleware(
         CORSMiddleware,
@@ -54,28 +138,39 @@ def create_application() -> FastAPI:
         allow_headers=["*"],
     )
 
+    # The root payload only depends on settings, so it is rendered once
+    root_payload = {
+        "app_name": settings.PROJECT_NAME,
+        "version": settings.VERSION,
+        "documentation": {
+            "swagger_ui": "/docs",
+            "redoc": "/redoc",
+            "openapi_spec": f"{settings.API_V1_PREFIX}/openapi.json",
+        },
+        "api_prefix": settings.API_V1_PREFIX,
+        "available_endpoints": [
+            f"{settings.API_V1_PREFIX}/auth/login",
+            f"{settings.API_V1_PREFIX}/auth/register",
+            f"{settings.API_V1_PREFIX}/auth/refresh",
+            f"{settings.API_V1_PREFIX}/auth/logout",
+            f"{settings.API_V1_PREFIX}/auth/availability",
+            f"{settings.API_V1_PREFIX}/users/me",
+            f"{settings.API_V1_PREFIX}/admin/stats/users",
+        ],
+        "status": "online",
+        "cors_enabled": True,
+    }
+    root_body = JSONResponse(root_payload).body
+    root_headers = conditional_headers(payload_etag(root_payload), "public, no-cache")
+
     @application.get("/")
-    async def root():
+    async def root(request: Request):
         """
         Root endpoint providing API information and documentation links
         """
-        return {
-            "app_name": settings.PROJECT_NAME,
-            "version": settings.VERSION,
-            "documentation": {
-                "swagger_ui": "/docs",
-                "redoc": "/redoc",
-                "openapi_spec": f"{settings.API_V1_PREFIX}/openapi.json",
-            },
-            "api_prefix": settings.API_V1_PREFIX,
-            "available_endpoints": [
-                f"{settings.API_V1_PREFIX}/auth/login",
-                f"{settings.API_V1_PREFIX}/auth/register",
-                f"{settings.API_V1_PREFIX}/users/me",
-            ],
-            "status": "online",
-            "cors_enabled": True,
-        }
+        if etag_matches(request, root_headers["ETag"]):
+            return not_modified(root_headers)
+        return Response(root_body, media_type="application/json", headers=root_headers)
 
     return application
 
@@ -0,0 +1,250 @@
+# app/middleware/middleware_profiling.py
+import asyncio
+import cProfile
+import hashlib
+import hmac
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config import settings
+
+
+def create_profile_token(ttl_seconds: Optional[int] = None) -> str:
+    """Header value that authorizes profiling of a request until it expires."""
+    expires = int(time.time()) + (
+        ttl_seconds or settings.PROFILING_SIGNATURE_TTL_SECONDS
+    )
+    return f"{expires}.{_sign(expires)}"
+
+
+def _sign(expires: int) -> str:
+    return hmac.new(
+        settings.SECRET_KEY.encode(), f"profile:{expires}".encode(), hashlib.sha256
+    ).hexdigest()
+
+
+def verify_profile_token(value: str) -> bool:
+    expires, _, signature = value.partition(".")
+    if not expires.isdigit() or int(expires) < time.time():
+        return False
+    return hmac.compare_digest(signature, _sign(int(expires)))
+
+
+class StackSampler:
+    """
+    Statistical profiler: a daemon thread records the stack of one target
+    thread every `interval` seconds. For async endpoints the target is the
+    event loop thread, so concurrent requests on the same loop show up too.
+    """
+
+    def __init__(self, thread_id: int, interval: float):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None or self.thread_id == own:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append((code.co_name, code.co_filename, code.co_firstlineno))
+                frame = frame.f_back
+            stack.reverse()
+            self.stacks[tuple(stack)] += 1
+
+
+def _frame_name(frame: Tuple[str, str, int]) -> str:
+    name, filename, line = frame
+    return f"{name} ({filename}:{line})"
+
+
+def write_collapsed(path: str, stacks: Counter):
+    """Brendan Gregg's collapsed format, as read by flamegraph.pl and speedscope."""
+    with open(path, "w") as f:
+        for stack, count in stacks.most_common():
+            f.write(";".join(_frame_name(frame) for frame in stack))
+            f.write(f" {count}\n")
+
+
+def write_speedscope(path: str, stacks: Counter, interval_ms: float, name: str):
+    frame_index: Dict[Tuple[str, str, int], int] = {}
+    frames: List[dict] = []
+    samples: List[List[int]] = []
+    weights: List[float] = []
+    for stack, count in stacks.items():
+        indexes = []
+        for frame in stack:
+            if frame not in frame_index:
+                frame_index[frame] = len(frames)
+                frames.append({"name": frame[0], "file": frame[1], "line": frame[2]})
+            indexes.append(frame_index[frame])
+        samples.append(indexes)
+        weights.append(count * interval_ms)
+
+    document = {
+        "$schema": "https://www.speedscope.app/file-format-schema.json",
+        "shared": {"frames": frames},
+        "profiles": [
+            {
+                "type": "sampled",
+                "name": name,
+                "unit": "milliseconds",
+                "startValue": 0,
+                "endValue": sum(weights),
+                "samples": samples,
+                "weights": weights,
+            }
+        ],
+        "name": name,
+        "exporter": settings.PROJECT_NAME,
+    }
+    with open(path, "w") as f:
+        json.dump(document, f)
+
+
+def _profile_key(filename: str) -> str:
+    # Every file of one profile shares the name up to the first dot
+    return filename.partition(".")[0]
+
+
+def rotate(directory: str, max_profiles: int):
+    """Keep only the newest `max_profiles` profiles, with all of their files."""
+    profiles: Dict[str, List[str]] = {}
+    mtimes: Dict[str, float] = {}
+    for entry in os.scandir(directory):
+        try:
+            if not entry.is_file():
+                continue
+            mtime = entry.stat().st_mtime
+        except OSError:
+            # Removed meanwhile, e.g. by another worker rotating
+            continue
+        key = _profile_key(entry.name)
+        profiles.setdefault(key, []).append(entry.path)
+        mtimes[key] = max(mtime, mtimes.get(key, mtime))
+    newest_first = sorted(profiles, key=mtimes.__getitem__, reverse=True)
+    for key in newest_first[max_profiles:]:
+        for path in profiles[key]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+class ProfilingMiddleware:
+    """
+    Profile selected requests and write the results to PROFILING_DIR.
+
+    A request is profiled when it carries a valid signed PROFILING_HEADER
+    (see create_profile_token) or is picked by PROFILING_SAMPLE_RATE. Only one
+    request is profiled at a time per worker; others pass through untouched.
+    The middleware is only installed when PROFILING_ENABLED is set, so the
+    disabled cost is nothing at all.
+
+    Modes: "sampling" writes .collapsed and .speedscope.json stack samples;
+    "cprofile" writes a .prof file readable with pstats or snakeviz.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self.mode = settings.PROFILING_MODE
+        if self.mode not in ("sampling", "cprofile"):
+            raise ValueError(f"Unsupported profiling mode: {self.mode}")
+        self.sample_rate = settings.PROFILING_SAMPLE_RATE
+        self.header = settings.PROFILING_HEADER.lower().encode()
+        self.interval = settings.PROFILING_INTERVAL_MS / 1000
+        self.directory = settings.PROFILING_DIR
+        self.max_profiles = settings.PROFILING_MAX_PROFILES
+        self._busy = threading.Lock()
+        os.makedirs(self.directory, exist_ok=True)
+
+    def _wants_profile(self, scope: Scope) -> bool:
+        for key, value in scope["headers"]:
+            if key == self.header:
+                return verify_profile_token(value.decode("latin-1"))
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or not self._wants_profile(scope):
+            await self.app(scope, receive, send)
+            return
+        if not self._busy.acquire(blocking=False):
+            await self.app(scope, receive, send)
+            return
+
+        path = re.sub(r"[^A-Za-z0-9]+", "_", scope["path"]).strip("_") or "root"
+        # The random part keeps ids unique within the same second and path
+        profile_id = (
+            f"{time.strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:8]}"
+            f"-{scope['method']}-{path}"
+        )
+
+        async def send_wrapper(message: Message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"x-profile-id", profile_id.encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        sampler = profiler = None
+        if self.mode == "sampling":
+            sampler = StackSampler(threading.get_ident(), self.interval)
+            sampler.start()
+        else:
+            profiler = cProfile.Profile()
+            profiler.enable()
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            if sampler is not None:
+                sampler.stop()
+            else:
+                profiler.disable()
+            try:
+                await asyncio.to_thread(
+                    self._write, profile_id, elapsed_ms, sampler, profiler
+                )
+            except Exception as e:
+                print(f"Writing profile {profile_id} failed: {str(e)}")
+            finally:
+                self._busy.release()
+
+    def _write(self, profile_id, elapsed_ms, sampler, profiler):
+        base = os.path.join(self.directory, f"{profile_id}-{elapsed_ms:.0f}ms")
+        if sampler is not None:
+            write_collapsed(f"{base}.collapsed", sampler.stacks)
+            write_speedscope(
+                f"{base}.speedscope.json",
+                sampler.stacks,
+                self.interval * 1000,
+                profile_id,
+            )
+        else:
+            profiler.dump_stats(f"{base}.prof")
+        rotate(self.directory, self.max_profiles)
@@ -0,0 +1,90 @@
+# app/middleware/middleware_unit_of_work.py
+from typing import Callable, Optional
+from sqlalchemy.orm import Session
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+class UnitOfWork:
+    """Request-scoped write session, created on first use."""
+
+    __slots__ = ("_session",)
+
+    def __init__(self):
+        self._session: Optional[Session] = None
+
+    @property
+    def session(self) -> Optional[Session]:
+        return self._session
+
+    def get_session(self, session_maker: Callable[[], Session]) -> Session:
+        if self._session is None:
+            self._session = session_maker()
+        return self._session
+
+    def commit(self):
+        if self._session is not None:
+            self._session.commit()
+
+    def rollback(self):
+        if self._session is not None:
+            self._session.rollback()
+
+    def close(self):
+        if self._session is not None:
+            self._session.close()
+            self._session = None
+
+
+class UnitOfWorkMiddleware:
+    """
+    Commit the request's write session exactly once.
+
+    The commit happens when the response starts, so clients never see a
+    success status for work that was not persisted. Error responses (>= 400)
+    and unhandled exceptions roll back. If the commit itself fails, a 500 is
+    sent instead of the original response.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        uow = UnitOfWork()
+        scope.setdefault("state", {})["unit_of_work"] = uow
+        failed = False
+
+        async def send_wrapper(message: Message):
+            nonlocal failed
+            if message["type"] == "http.response.start" and not failed:
+                if message["status"] >= 400:
+                    uow.rollback()
+                else:
+                    try:
+                        uow.commit()
+                    except Exception as e:
+                        print(f"Unit of work commit failed: {str(e)}")
+                        uow.rollback()
+                        failed = True
+                        response = JSONResponse(
+                            {"detail": "Could not save changes"}, status_code=500
+                        )
+                        await response(scope, receive, send)
+                        return
+                uow.close()
+            if failed:
+                # Swallow the original response body after a failed commit
+                return
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except Exception:
+            uow.rollback()
+            raise
+        finally:
+            uow.close()
@@ -0,0 +1,69 @@
+# app/routes/routes_admin.py
+import asyncio
+
+from fastapi import APIRouter, Depends, Query, Request
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.db.database import Base, DatabaseFactory
+from app.db.schema import schema_cache
+from app.db.session import get_read_db
+from app.db.repositories.repository_stats import UserStatsRepository
+from app.dependencies.dependency_auth import check_admin_access
+from app.utils.utils_audit import audit_queue
+
+router = APIRouter(
+    prefix="/admin", tags=["Admin"], dependencies=[Depends(check_admin_access)]
+)
+
+
+@router.get("/scheduler")
+async def scheduler_jobs(request: Request):
+    """Per-job run counts and timings of the background scheduler"""
+    scheduler = getattr(request.app.state, "scheduler", None)
+    if scheduler is None:
+        return {"running": False, "jobs": {}}
+    return {"running": scheduler.running, "jobs": scheduler.metrics()}
+
+
+@router.get("/audit")
+async def audit_status():
+    """Queue depth and counters of the authentication audit log"""
+    return audit_queue.info()
+
+
+@router.get("/stats/users")
+async def user_stats(
+    days: int = Query(30, ge=1, le=settings.USER_STATS_DAILY_RETENTION_DAYS),
+    db: Session = Depends(get_read_db),
+):
+    """User counts by role and status, recent activity and daily sign-ups"""
+    return UserStatsRepository(db).summary(days)
+
+
+def _schema_report():
+    snapshot = schema_cache.snapshot
+    if snapshot is None:
+        return {"reflected": False}
+    return {
+        "reflected": True,
+        "fingerprint": snapshot.fingerprint,
+        "version": snapshot.version,
+        "reflected_at": snapshot.reflected_at,
+        "dialect": snapshot.dialect,
+        "tables": len(snapshot.tables),
+        "drift": schema_cache.drift(Base.metadata).as_dict(),
+    }
+
+
+@router.get("/schema")
+async def schema_status():
+    """Fingerprint of the cached schema snapshot and drift from the models"""
+    return _schema_report()
+
+
+@router.post("/schema/refresh")
+async def refresh_schema():
+    """Re-reflect the database schema now instead of waiting for the job"""
+    await asyncio.to_thread(schema_cache.refresh, DatabaseFactory.get_instance().engine)
+    return _schema_report()
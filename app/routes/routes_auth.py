@@ -1,40 +1,64 @@
 # app/routes/routes_auth.py
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
 from datetime import timedelta
-from sqlalchemy import inspect
+from typing import Optional
 
 
-from app.db.session import get_db
+from app.db.session import get_db, get_read_db, get_tenant_id
 from app.db.models.models_user import User
+from app.db.repositories.repository_user import UserRepository
+from app.db.pipeline import pipeline
 from app.utils.utils_auth import (
     verify_password,
     create_access_token,
     get_password_hash,
 )
 from app.config import settings  # Import settings instead
-from app.schemas.schemas_auth import Token, UserCreate, UserLogin
+from app.schemas.schemas_auth import (
+    Token,
+    UserCreate,
+    UserLogin,
+    RefreshRequest,
+    AvailabilityResponse,
+)
+from app.utils.utils_session import (
+    create_session,
+    get_session_with_user,
+    rotate_session,
+    revoke_session_family,
+)
+from app.utils.utils_stats import record_login
+from app.utils.utils_availability import availability_index
+from app.utils.utils_audit import record_auth_event
+from app.db.enums.enums_audit import AuthEventType
 from app.db.enums.enums_user import UserStatus
-from app.db.database import DatabaseFactory, Base
+from app.db.database import Base
+from app.db.schema import schema_cache
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 
 
 @router.post("/login", response_model=Token)
 async def login(
-    form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)
+    request: Request,
+    form_data: OAuth2PasswordRequestForm = Depends(),
+    db: Session = Depends(get_db),
+    tenant_id: str = Depends(get_tenant_id),
 ):
+    users = UserRepository(db)
+
     # Try to find user by email or username
-    user = (
-        db.query(User)
-        .filter(
-            (User.email == form_data.username) | (User.username == form_data.username)
-        )
-        .first()
-    )
+    user = users.get_auth_by_login(form_data.username)
 
     if not user:
+        record_auth_event(
+            request,
+            AuthEventType.LOGIN_FAILURE,
+            login=form_data.username,
+            reason="unknown_user",
+        )
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username/email or password",
@@ -42,6 +66,13 @@ async def login(
         )
 
     if not verify_password(form_data.password, user.hashed_password):
+        record_auth_event(
+            request,
+            AuthEventType.LOGIN_FAILURE,
+            user_id=user.id,
+            login=form_data.username,
+            reason="bad_password",
+        )
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username/email or password",
@@ -49,6 +80,13 @@ async def login(
         )
 
     if not user.is_active or user.status != UserStatus.ACTIVE:
+        record_auth_event(
+            request,
+            AuthEventType.LOGIN_FAILURE,
+            user_id=user.id,
+            login=form_data.username,
+            reason="inactive",
+        )
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="User account is inactive or suspended",
@@ -56,26 +94,152 @@ async def login(
 
     # Create access token using settings
     access_token = create_access_token(
-        data={"sub": user.email, "role": user.role.value},
+        data={"sub": user.email, "role": user.role.value, "tid": tenant_id},
         expires_delta=timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES),
     )
 
-    # Update last login
-    user.update_last_login()
-    db.commit()
+    # Issue a refresh token so clients can renew without re-entering credentials
+    _, refresh_token = create_session(db, user.id)
+
+    # Update last login; committed by the unit of work. Neither write needs
+    # a result, so with psycopg 3 they share one round trip
+    with pipeline(db):
+        login_at = users.touch_last_login(user.id)
+        record_login(db, user.last_login, login_at)
+
+    # Audited once the unit of work has committed the login
+    record_auth_event(
+        request,
+        AuthEventType.LOGIN_SUCCESS,
+        db=db,
+        user_id=user.id,
+        login=form_data.username,
+    )
 
-    return {"access_token": access_token, "token_type": "bearer"}
+    return {
+        "access_token": access_token,
+        "token_type": "bearer",
+        "refresh_token": refresh_token,
+    }
+
+
+@router.post("/refresh", response_model=Token)
+async def refresh(
+    data: RefreshRequest,
+    db: Session = Depends(get_db),
+    tenant_id: str = Depends(get_tenant_id),
+):
+    """Exchange a refresh token for a new access/refresh token pair."""
+    invalid_token = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Invalid or expired refresh token",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+    row = get_session_with_user(db, data.refresh_token)
+    if not row:
+        raise invalid_token
+
+    session, email, role, is_active, user_status = row
+
+    def reject_reused_token():
+        # A rotated token was presented again: treat it as stolen and
+        # revoke its rotation chain, i.e. the session the thief or the
+        # owner now holds. Commit explicitly, since the unit of work rolls
+        # back error responses
+        revoke_session_family(db, session)
+        db.commit()
+        raise invalid_token
+
+    if session.is_revoked:
+        reject_reused_token()
+
+    if session.is_expired:
+        raise invalid_token
+
+    if not is_active or user_status != UserStatus.ACTIVE:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="User account is inactive or suspended",
+        )
+
+    rotated = rotate_session(db, session)
+    if rotated is None:
+        # Lost the race against a concurrent refresh with the same token
+        reject_reused_token()
+    _, refresh_token = rotated
+
+    access_token = create_access_token(
+        data={"sub": email, "role": role.value, "tid": tenant_id},
+        expires_delta=timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES),
+    )
+
+    return {
+        "access_token": access_token,
+        "token_type": "bearer",
+        "refresh_token": refresh_token,
+    }
+
+
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+async def logout(data: RefreshRequest, db: Session = Depends(get_db)):
+    """Revoke a refresh token. Unknown or already revoked tokens are ignored."""
+    row = get_session_with_user(db, data.refresh_token)
+    if row and not row[0].is_revoked:
+        row[0].revoke()
+
+
+@router.get("/availability", response_model=AvailabilityResponse)
+async def availability(
+    username: Optional[str] = None,
+    email: Optional[str] = None,
+    tenant_id: str = Depends(get_tenant_id),
+    db: Session = Depends(get_read_db),
+):
+    """
+    Check whether a username and/or email can still be registered.
+    Answered from the in-memory filter when possible; only possible matches
+    (and tenant databases, which are not indexed) reach the database.
+    """
+    if username is None and email is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Provide a username or an email",
+        )
+
+    use_index = not tenant_id
+    users = UserRepository(db)
+    result = {}
+    if username is not None:
+        taken = (
+            not use_index or availability_index.username_might_exist(username)
+        ) and users.username_exists(username)
+        result["username"] = {"value": username, "available": not taken}
+    if email is not None:
+        taken = (
+            not use_index or availability_index.email_might_exist(email)
+        ) and users.email_exists(email)
+        result["email"] = {"value": email, "available": not taken}
+    return result
 
 
 @router.post("/register", status_code=status.HTTP_201_CREATED)
-async def register(user_data: UserCreate, db: Session = Depends(get_db)):
+async def register(
+    request: Request,
+    user_data: UserCreate,
+    tenant_id: str = Depends(get_tenant_id),
+    db: Session = Depends(get_db),
+):
     # Check if user already exists
-    if db.query(User).filter(User.email == user_data.email).first():
+    conflict = UserRepository(db).find_registration_conflict(
+        user_data.email, user_data.username
+    )
+    if conflict == "email":
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, detail="Email already registered"
         )
 
-    if db.query(User).filter(User.username == user_data.username).first():
+    if conflict == "username":
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, detail="Username already taken"
         )
@@ -92,8 +256,17 @@ async def register(user_data: UserCreate, db: Session = Depends(get_db)):
     )
 
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    record_auth_event(
+        request,
+        AuthEventType.REGISTER,
+        db=db,
+        user=new_user,
+        login=new_user.username,
+    )
+
+    # A failed commit only leaves a false positive behind, which is harmless
+    if not tenant_id:
+        availability_index.add(new_user.username, new_user.email)
 
     return {"message": "User created successfully"}
 
@@ -110,21 +283,23 @@ async def test_auth(form_data: OAuth2PasswordRequestForm = Depends()):
 
 @router.get("/debug-tables", include_in_schema=True)
 async def debug_tables():
-    """Debug endpoint to check database tables"""
-    factory = DatabaseFactory.get_instance()
-    inspector = inspect(factory.engine)
-    tables = inspector.get_table_names()
-
-    table_details = {}
-    for table in tables:
-        columns = [
-            {"name": col["name"], "type": str(col["type"])}
-            for col in inspector.get_columns(table)
-        ]
-        table_details[table] = columns
+    """Debug endpoint to check database tables, served from the schema snapshot"""
+    snapshot = schema_cache.snapshot
+    if snapshot is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Schema snapshot not available yet",
+        )
 
     return {
-        "tables": tables,
-        "details": table_details,
+        "tables": snapshot.table_names,
+        "details": {
+            table: [{"name": col["name"], "type": col["type"]} for col in columns]
+            for table, columns in snapshot.tables.items()
+        },
         "metadata_tables": list(Base.metadata.tables.keys()),
+        "fingerprint": snapshot.fingerprint,
+        "version": snapshot.version,
+        "reflected_at": snapshot.reflected_at,
+        "drift": schema_cache.drift(Base.metadata).as_dict(),
     }
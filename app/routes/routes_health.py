@@ -0,0 +1,27 @@
+# app/routes/routes_health.py
+from fastapi import APIRouter, status
+from fastapi.responses import JSONResponse
+
+from app.utils.utils_health import database_health
+
+router = APIRouter(tags=["Health"])
+
+
+@router.get("/healthz", include_in_schema=False)
+async def healthz():
+    """Liveness: the worker is up and its event loop responds"""
+    return {"status": "ok"}
+
+
+@router.get("/readyz", include_in_schema=False)
+async def readyz():
+    """Readiness from the cached, background-refreshed database ping"""
+    snapshot = database_health.snapshot()
+    return JSONResponse(
+        snapshot,
+        status_code=(
+            status.HTTP_200_OK
+            if snapshot["ready"]
+            else status.HTTP_503_SERVICE_UNAVAILABLE
+        ),
+    )
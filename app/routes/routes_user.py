@@ -1,16 +1,37 @@
 # app/routes/routes_user.py
-from fastapi import APIRouter, Depends
-from app.db.models.models_user import User
+from fastapi import APIRouter, Depends, Request
+from fastapi.responses import JSONResponse
+from app.config import settings
+from app.schemas.schemas_principal import UserPrincipal
 from app.utils.utils_auth import get_current_user
+from app.utils.utils_http_cache import (
+    conditional_headers,
+    etag_matches,
+    not_modified,
+    principal_etag,
+)
 
 router = APIRouter(prefix="/users", tags=["Users"])
 
 
 @router.get("/me")
-async def read_users_me(current_user: User = Depends(get_current_user)):
-    return {
-        "email": current_user.email,
-        "username": current_user.username,
-        "full_name": current_user.full_name,
-        "role": current_user.role.value,
-    }
+async def read_users_me(
+    request: Request, current_user: UserPrincipal = Depends(get_current_user)
+):
+    # Revalidated on every use; a 304 is decided before building the body
+    headers = conditional_headers(
+        principal_etag(current_user),
+        "private, no-cache",
+        f"Authorization, {settings.TENANT_HEADER}",
+    )
+    if etag_matches(request, headers["ETag"]):
+        return not_modified(headers)
+    return JSONResponse(
+        {
+            "email": current_user.email,
+            "username": current_user.username,
+            "full_name": current_user.full_name,
+            "role": current_user.role.value,
+        },
+        headers=headers,
+    )
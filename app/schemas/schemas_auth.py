@@ -6,6 +6,11 @@ from typing import Optional
 class Token(BaseModel):
     access_token: str
     token_type: str
+    refresh_token: Optional[str] = None
+
+
+class RefreshRequest(BaseModel):
+    refresh_token: str
 
 
 class TokenData(BaseModel):
@@ -24,3 +29,13 @@ class UserCreate(BaseModel):
     password: str
     first_name: Optional[str] = None
     last_name: Optional[str] = None
+
+
+class AvailabilityResult(BaseModel):
+    value: str
+    available: bool
+
+
+class AvailabilityResponse(BaseModel):
+    username: Optional[AvailabilityResult] = None
+    email: Optional[AvailabilityResult] = None
@@ -0,0 +1,43 @@
+# app/schemas/schemas_principal.py
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Optional
+
+from app.db.enums.enums_user import UserRole, UserStatus
+
+
+@dataclass(frozen=True, slots=True)
+class UserPrincipal:
+    """
+    Immutable snapshot of the authenticated user.
+    Loaded from a column-limited query instead of a full User entity, so it
+    carries no ORM state and is safe to share across requests and caches.
+    """
+
+    id: int
+    email: str
+    username: str
+    full_name: str
+    role: UserRole
+    status: UserStatus
+    is_active: bool
+    # Version of the user row; changes on every update
+    updated_at: Optional[datetime] = None
+
+    @classmethod
+    def from_row(cls, row: Any) -> "UserPrincipal":
+        """Build from a row with the user's principal columns."""
+        if row.first_name or row.last_name:
+            full_name = f"{row.first_name or ''} {row.last_name or ''}".strip()
+        else:
+            full_name = row.username
+        return cls(
+            id=row.id,
+            email=row.email,
+            username=row.username,
+            full_name=full_name,
+            role=row.role,
+            status=row.status,
+            is_active=bool(row.is_active),
+            updated_at=row.updated_at,
+        )
@@ -0,0 +1,150 @@
+# app/tasks/tasks_audit.py
+import asyncio
+import glob
+import os
+import uuid
+from typing import Any, Dict, List
+
+from app.db.database import DatabaseFactory
+from app.db.repositories.repository_audit import AuditRepository
+from app.utils.utils_audit import AuditQueue, event_from_json
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+
+def write_audit_batch(rows: List[Dict[str, Any]]) -> int:
+    """Bulk insert one batch into auth_events in its own transaction."""
+    with DatabaseFactory.get_instance().engine.begin() as conn:
+        return AuditRepository(conn).insert_many(rows)
+
+
+def _replay_claim(claim: str, batch_size: int) -> int:
+    """Replay one claimed spill file under an exclusive flock, then remove it."""
+    try:
+        f = open(claim)
+    except FileNotFoundError:
+        return 0
+    with f:
+        if fcntl is not None:
+            try:
+                fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                # Its owner is still replaying it
+                return 0
+            try:
+                current = os.stat(claim)
+            except FileNotFoundError:
+                return 0
+            if current.st_ino != os.fstat(f.fileno()).st_ino:
+                # Replayed and removed by another worker since we opened it
+                return 0
+
+        replayed = 0
+        batch: List[Dict[str, Any]] = []
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                batch.append(event_from_json(line))
+            except ValueError:
+                # A torn last line from a crash mid-write
+                print(f"Skipping unreadable audit spill line: {line[:80]!r}")
+                continue
+            if len(batch) >= batch_size:
+                replayed += write_audit_batch(batch)
+                batch = []
+        if batch:
+            replayed += write_audit_batch(batch)
+        try:
+            os.remove(claim)
+        except FileNotFoundError:
+            pass
+    return replayed
+
+
+def replay_spill_file(path: str, batch_size: int) -> int:
+    """
+    Load events spilled by earlier runs into auth_events and remove the file.
+
+    Each worker claims the file by renaming it to a name of its own; the
+    rename is atomic, so exactly one worker gets it and events spilled
+    meanwhile go to a fresh file. Claims left behind by a worker that died
+    mid-replay are picked up as well: a claim is only replayed under an
+    exclusive flock, which the kernel releases when its holder exits.
+    Already stored events are skipped by event_id.
+    """
+    claim = f"{path}.replaying.{os.getpid()}-{uuid.uuid4().hex[:8]}"
+    try:
+        os.rename(path, claim)
+    except FileNotFoundError:
+        pass
+
+    replayed = 0
+    for pending in sorted(glob.glob(f"{glob.escape(path)}.replaying*")):
+        replayed += _replay_claim(pending, batch_size)
+    return replayed
+
+
+class AuditWriter:
+    """
+    Background task that drains the audit queue into auth_events.
+
+    Every `interval` seconds it writes everything queued, in batches of
+    `batch_size` rows, off the event loop. A batch that fails is handed
+    back to the queue (or its overflow policy) and retried on the next
+    round. stop() flushes whatever is left.
+    """
+
+    def __init__(self, queue: AuditQueue, batch_size: int, interval: float):
+        self.queue = queue
+        self.batch_size = batch_size
+        self.interval = interval
+        self._task: asyncio.Task = None
+        self._stopping = asyncio.Event()
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    async def start(self):
+        if self._task is None:
+            self._stopping.clear()
+            self._task = asyncio.create_task(self._run(), name="audit-writer")
+
+    async def stop(self):
+        if self._task is not None:
+            # Let an in-flight batch finish instead of cancelling it
+            self._stopping.set()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        # Final flush; whatever cannot be written now goes to the spill file
+        flushed = await self.flush()
+        if len(self.queue):
+            leftover = self.queue.take(len(self.queue))
+            self.queue.spill(leftover)
+            print(f"Spilled {len(leftover)} unwritten audit events")
+        print(f"Audit writer stopped ({flushed} events flushed)")
+
+    async def _run(self):
+        while not self._stopping.is_set():
+            try:
+                await asyncio.wait_for(self._stopping.wait(), self.interval)
+            except asyncio.TimeoutError:
+                await self.flush()
+
+    async def flush(self) -> int:
+        written = 0
+        while True:
+            batch = self.queue.take(self.batch_size)
+            if not batch:
+                return written
+            try:
+                written += await asyncio.to_thread(write_audit_batch, batch)
+            except Exception as e:
+                self.queue.requeue(batch)
+                print(f"Writing audit events failed: {type(e).__name__}: {str(e)}")
+                return written
+            self.queue.written += len(batch)
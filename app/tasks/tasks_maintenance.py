@@ -0,0 +1,181 @@
+# app/tasks/tasks_maintenance.py
+import os
+from typing import Callable, Optional
+
+from sqlalchemy import make_url
+
+from app.config import settings
+from app.db.database import Base, DatabaseFactory
+from app.db.models.models_stats import UserStat
+from app.db.repositories.repository_stats import UserStatsRepository
+from app.db.schema import schema_cache
+from app.tasks.tasks_scheduler import (
+    CronTrigger,
+    IntervalTrigger,
+    Scheduler,
+    leader_election_for,
+)
+from app.utils.utils_availability import availability_index
+from app.utils.utils_health import database_health
+from app.utils.utils_session import purge_expired_sessions
+
+
+def for_each_database(job: Callable[[str], int], name: str) -> int:
+    """
+    Run `job` against the default and every tenant database.
+
+    A failing database does not stop the others; the first error is raised
+    once all of them were tried, so the scheduler still records the failure.
+    """
+    total = 0
+    error: Optional[Exception] = None
+    for url in DatabaseFactory.get_instance().database_urls():
+        try:
+            total += job(url)
+        except Exception as e:
+            print(f"{name} failed for {make_url(url).render_as_string()}: {e}")
+            error = error or e
+    if error is not None:
+        raise error
+    return total
+
+
+def _purge_expired_sessions(url: str) -> int:
+    with DatabaseFactory.get_instance().maintenance_session(url) as db:
+        return purge_expired_sessions(db)
+
+
+def purge_expired_sessions_job() -> int:
+    """Delete expired refresh-token sessions in batches, in every database."""
+    deleted = for_each_database(_purge_expired_sessions, "Session purge")
+    if deleted:
+        print(f"Purged {deleted} expired sessions")
+    return deleted
+
+
+def dispose_idle_engines_job() -> int:
+    """Dispose tenant engines that have been idle for too long."""
+    return DatabaseFactory.get_instance().dispose_idle()
+
+
+def ping_database_job() -> bool:
+    """Refresh the cached readiness result used by /readyz."""
+    return database_health.ping(DatabaseFactory.get_instance().engine)
+
+
+def _reconcile_user_stats(url: str) -> int:
+    with DatabaseFactory.get_instance().maintenance_session(url) as db:
+        written = UserStatsRepository(db).reconcile()
+        db.commit()
+    return written
+
+
+def reconcile_user_stats_job() -> int:
+    """Rebuild user_stats from users in every database to correct any drift."""
+    written = for_each_database(_reconcile_user_stats, "User stats reconcile")
+    print(f"Reconciled user stats ({written} counters)")
+    return written
+
+
+def _seed_user_stats(url: str) -> int:
+    with DatabaseFactory.get_instance().maintenance_session(url, read=True) as db:
+        seeded = db.query(UserStat.metric).first() is not None
+    return 0 if seeded else _reconcile_user_stats(url)
+
+
+def seed_user_stats():
+    """Populate user_stats on first start against an existing users table."""
+    for_each_database(_seed_user_stats, "User stats seeding")
+
+
+def rebuild_availability_index_job() -> int:
+    """Rebuild this worker's Bloom filter, picking up other workers' signups."""
+    # Streaming uses a server-side cursor, which needs a transaction; the
+    # autocommit read profile cannot provide one on PostgreSQL
+    return availability_index.rebuild(DatabaseFactory.get_instance().session_maker)
+
+
+def refresh_schema_snapshot_job() -> str:
+    """Re-reflect the schema so drift from migrations or manual DDL shows up."""
+    previous = schema_cache.snapshot
+    snapshot = schema_cache.refresh(DatabaseFactory.get_instance().engine)
+    if previous is not None and previous.fingerprint != snapshot.fingerprint:
+        print(f"Schema changed (version {snapshot.version})")
+        drift = schema_cache.drift(Base.metadata)
+        if drift.has_drift:
+            print(f"Schema drift detected: {drift.as_dict()}")
+    return snapshot.fingerprint
+
+
+def create_scheduler(maintenance: bool = True) -> Scheduler:
+    """
+    Build the app scheduler with leader election matching the database.
+    The readiness ping always runs; `maintenance` adds the other jobs.
+    """
+    leader = None
+    if maintenance:
+        factory = DatabaseFactory.get_instance()
+        lock_file = settings.SCHEDULER_LOCK_FILE or os.path.join(
+            factory.db_settings.DB_DIR, "scheduler.lock"
+        )
+        leader = leader_election_for(
+            factory.engine, settings.SCHEDULER_LOCK_KEY, lock_file
+        )
+    scheduler = Scheduler(leader=leader)
+    register_health_jobs(scheduler)
+    if maintenance:
+        register_maintenance_jobs(scheduler)
+    return scheduler
+
+
+def register_health_jobs(scheduler: Scheduler):
+    """Keep the cached /readyz result fresh; without this it goes stale."""
+    interval = settings.HEALTH_CHECK_INTERVAL_SECONDS
+    scheduler.add_job(
+        "ping_database",
+        ping_database_job,
+        IntervalTrigger(interval, jitter=interval * 0.1),
+        timeout=interval,
+        on_timeout=database_health.record_timeout,
+    )
+    # A few missed pings mark the worker unready
+    database_health.stale_after = interval * 3
+
+
+def register_maintenance_jobs(scheduler: Scheduler):
+    jitter = settings.SCHEDULER_JITTER_SECONDS
+
+    # Shared-database work, over the default and every tenant database: one
+    # worker is enough
+    scheduler.add_job(
+        "purge_expired_sessions",
+        purge_expired_sessions_job,
+        IntervalTrigger(settings.SESSION_PURGE_INTERVAL_SECONDS, jitter=jitter),
+        leader_only=True,
+    )
+
+    scheduler.add_job(
+        "reconcile_user_stats",
+        reconcile_user_stats_job,
+        CronTrigger(settings.USER_STATS_RECONCILE_CRON, jitter=jitter),
+        leader_only=True,
+    )
+
+    # Per-worker housekeeping
+    scheduler.add_job(
+        "rebuild_availability_index",
+        rebuild_availability_index_job,
+        IntervalTrigger(settings.AVAILABILITY_REBUILD_INTERVAL_SECONDS, jitter=jitter),
+    )
+
+    scheduler.add_job(
+        "refresh_schema_snapshot",
+        refresh_schema_snapshot_job,
+        IntervalTrigger(settings.SCHEMA_REFRESH_INTERVAL_SECONDS, jitter=jitter),
+    )
+
+    scheduler.add_job(
+        "dispose_idle_engines",
+        dispose_idle_engines_job,
+        IntervalTrigger(max(60, settings.DB_ENGINE_IDLE_SECONDS // 2), jitter=jitter),
+    )
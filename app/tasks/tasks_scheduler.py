@@ -0,0 +1,434 @@
+# app/tasks/tasks_scheduler.py
+import asyncio
+import inspect as pyinspect
+import os
+import random
+import time
+from abc import ABC, abstractmethod
+from calendar import monthrange
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import NullPool
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+
+class Trigger(ABC):
+    def __init__(self, jitter: float = 0.0):
+        self.jitter = jitter
+
+    @abstractmethod
+    def _next(self, now: float) -> float:
+        pass
+
+    def next_fire(self, now: float) -> float:
+        """Next run time (epoch seconds) after now, with random jitter added."""
+        fire_at = self._next(now)
+        if self.jitter:
+            fire_at += random.uniform(0, self.jitter)
+        return fire_at
+
+
+class IntervalTrigger(Trigger):
+    """Run every `seconds`; the first run happens after one interval."""
+
+    def __init__(self, seconds: float, jitter: float = 0.0, run_immediately=False):
+        super().__init__(jitter)
+        if seconds <= 0:
+            raise ValueError("Interval must be positive")
+        self.seconds = seconds
+        self._first = run_immediately
+
+    def _next(self, now: float) -> float:
+        if self._first:
+            self._first = False
+            return now
+        return now + self.seconds
+
+
+class CronTrigger(Trigger):
+    """
+    Five-field cron expression evaluated in UTC:
+    minute hour day-of-month month day-of-week (0 or 7 = Sunday).
+    Supports `*`, lists (`1,15`), ranges (`1-5`) and steps (`*/10`, `0-30/5`).
+    """
+
+    _FIELDS = ((0, 59), (0, 23), (1, 31), (1, 12), (0, 7))
+
+    def __init__(self, expression: str, jitter: float = 0.0):
+        super().__init__(jitter)
+        parts = expression.split()
+        if len(parts) != 5:
+            raise ValueError(f"Invalid cron expression: {expression}")
+        self.expression = expression
+        sets = [self._parse(p, lo, hi) for p, (lo, hi) in zip(parts, self._FIELDS)]
+        self.minutes, self.hours, self.days, self.months, dows = sets
+        self.weekdays = {d % 7 for d in dows}
+        self._dom_any = parts[2] == "*"
+        self._dow_any = parts[4] == "*"
+
+    @staticmethod
+    def _parse(field: str, lo: int, hi: int) -> Set[int]:
+        values: Set[int] = set()
+        for item in field.split(","):
+            step = 1
+            if "/" in item:
+                item, step_str = item.split("/", 1)
+                step = int(step_str)
+            if item == "*":
+                start, end = lo, hi
+            elif "-" in item:
+                start, end = (int(v) for v in item.split("-", 1))
+            else:
+                start = end = int(item)
+            if start < lo or end > hi or start > end or step < 1:
+                raise ValueError(f"Invalid cron field: {field}")
+            values.update(range(start, end + 1, step))
+        return values
+
+    def _day_matches(self, dt: datetime) -> bool:
+        dom = dt.day in self.days
+        dow = (dt.weekday() + 1) % 7 in self.weekdays
+        if self._dom_any:
+            return dow
+        if self._dow_any:
+            return dom
+        # Both restricted: standard cron matches either
+        return dom or dow
+
+    def _next(self, now: float) -> float:
+        dt = datetime.fromtimestamp(now, timezone.utc).replace(second=0, microsecond=0)
+        dt += timedelta(minutes=1)
+        limit = dt + timedelta(days=366 * 5)
+        while dt < limit:
+            if dt.month not in self.months:
+                days_left = monthrange(dt.year, dt.month)[1] - dt.day + 1
+                dt = (dt + timedelta(days=days_left)).replace(hour=0, minute=0)
+                continue
+            if not self._day_matches(dt):
+                dt = (dt + timedelta(days=1)).replace(hour=0, minute=0)
+                continue
+            if dt.hour not in self.hours:
+                dt = (dt + timedelta(hours=1)).replace(minute=0)
+                continue
+            if dt.minute not in self.minutes:
+                dt += timedelta(minutes=1)
+                continue
+            return dt.timestamp()
+        raise ValueError(f"Cron expression never fires: {self.expression}")
+
+
+class LeaderElection(ABC):
+    """Non-blocking, process-wide leadership used for leader-only jobs."""
+
+    @abstractmethod
+    def try_acquire(self) -> bool:
+        """Return True if this worker is (still) the leader."""
+
+    @abstractmethod
+    def release(self):
+        pass
+
+
+class FileLeaderLock(LeaderElection):
+    """flock()-based leadership for workers sharing a host (SQLite)."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._fd: Optional[int] = None
+
+    def try_acquire(self) -> bool:
+        if fcntl is None:
+            return True
+        if self._fd is not None:
+            return True
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            return False
+        self._fd = fd
+        return True
+
+    def release(self):
+        if self._fd is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+            os.close(self._fd)
+            self._fd = None
+
+
+class PostgresAdvisoryLock(LeaderElection):
+    """
+    Session-level pg_try_advisory_lock held on a dedicated connection, kept
+    outside the application pool. If the connection drops, Postgres releases
+    the lock and another worker takes over on its next attempt.
+    """
+
+    def __init__(self, url, key: int):
+        self.key = key
+        self._engine = create_engine(url, poolclass=NullPool)
+        self._conn = None
+
+    def try_acquire(self) -> bool:
+        if self._conn is not None:
+            try:
+                self._conn.execute(text("SELECT 1"))
+                return True
+            except Exception:
+                self._drop()
+        try:
+            conn = self._engine.connect().execution_options(
+                isolation_level="AUTOCOMMIT"
+            )
+            acquired = conn.execute(
+                text("SELECT pg_try_advisory_lock(:key)"), {"key": self.key}
+            ).scalar()
+        except Exception as e:
+            print(f"Leader election failed: {str(e)}")
+            return False
+        if acquired:
+            self._conn = conn
+            return True
+        conn.close()
+        return False
+
+    def _drop(self):
+        try:
+            self._conn.close()
+        except Exception:
+            pass
+        self._conn = None
+
+    def release(self):
+        if self._conn is not None:
+            try:
+                self._conn.execute(
+                    text("SELECT pg_advisory_unlock(:key)"), {"key": self.key}
+                )
+            except Exception:
+                pass
+            self._drop()
+        self._engine.dispose()
+
+
+def leader_election_for(engine, lock_key: int, lock_file: str) -> LeaderElection:
+    """Pick the election backend matching the database engine."""
+    if engine.dialect.name == "postgresql":
+        return PostgresAdvisoryLock(engine.url, lock_key)
+    return FileLeaderLock(lock_file)
+
+
+class JobMetrics:
+    __slots__ = (
+        "runs",
+        "failures",
+        "skipped",
+        "last_started",
+        "last_duration",
+        "total_duration",
+        "max_duration",
+        "last_error",
+    )
+
+    def __init__(self):
+        self.runs = 0
+        self.failures = 0
+        self.skipped = 0
+        self.last_started: Optional[float] = None
+        self.last_duration: Optional[float] = None
+        self.total_duration = 0.0
+        self.max_duration = 0.0
+        self.last_error: Optional[str] = None
+
+    def record(self, started: float, duration: float, error: Optional[str]):
+        self.runs += 1
+        self.last_started = started
+        self.last_duration = duration
+        self.total_duration += duration
+        self.max_duration = max(self.max_duration, duration)
+        if error is not None:
+            self.failures += 1
+            self.last_error = error
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "runs": self.runs,
+            "failures": self.failures,
+            "skipped": self.skipped,
+            "last_started": (
+                datetime.fromtimestamp(self.last_started, timezone.utc).isoformat()
+                if self.last_started
+                else None
+            ),
+            "last_duration_ms": (
+                round(self.last_duration * 1000, 3)
+                if self.last_duration is not None
+                else None
+            ),
+            "avg_duration_ms": (
+                round(self.total_duration / self.runs * 1000, 3) if self.runs else None
+            ),
+            "max_duration_ms": round(self.max_duration * 1000, 3),
+            "last_error": self.last_error,
+        }
+
+
+class Job:
+    def __init__(
+        self,
+        name: str,
+        func: Callable,
+        trigger: Trigger,
+        leader_only: bool = False,
+        timeout: Optional[float] = None,
+        on_timeout: Optional[Callable[[], Any]] = None,
+    ):
+        self.name = name
+        self.func = func
+        self.trigger = trigger
+        self.leader_only = leader_only
+        self.timeout = timeout
+        self.on_timeout = on_timeout
+        self.metrics = JobMetrics()
+        self.next_run: Optional[float] = None
+        self._inflight: Optional[asyncio.Future] = None
+
+    @property
+    def busy(self) -> bool:
+        """True while the previous run, even one that timed out, is still going."""
+        return self._inflight is not None and not self._inflight.done()
+
+    async def run(self):
+        is_coroutine = pyinspect.iscoroutinefunction(self.func)
+        if is_coroutine:
+            future = asyncio.ensure_future(self.func())
+        else:
+            # Sync jobs do blocking DB work; keep them off the event loop
+            future = asyncio.get_running_loop().run_in_executor(None, self.func)
+        # Nobody awaits a run abandoned by a timeout; retrieve its outcome
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self._inflight = future
+
+        try:
+            done, _ = await asyncio.wait({future}, timeout=self.timeout)
+        except asyncio.CancelledError:
+            if is_coroutine:
+                future.cancel()
+            raise
+        if not done:
+            # A thread cannot be interrupted: it runs on and keeps the job
+            # busy, so later runs are skipped instead of piling up threads
+            if is_coroutine:
+                future.cancel()
+            if self.on_timeout is not None:
+                self.on_timeout()
+            raise TimeoutError(f"timed out after {self.timeout}s")
+        return future.result()
+
+
+class Scheduler:
+    """
+    In-process asyncio scheduler started and stopped by the app lifespan.
+
+    Every worker runs the scheduler; jobs added with leader_only=True run only
+    in the worker currently holding the leader lock, others run everywhere.
+    A job never overlaps with itself: while a run is still going, including
+    a sync run that outlived its timeout, later runs are skipped.
+    """
+
+    def __init__(self, leader: Optional[LeaderElection] = None):
+        self.leader = leader
+        self._jobs: Dict[str, Job] = {}
+        self._tasks: List[asyncio.Task] = []
+        self._leader_lock = asyncio.Lock()
+
+    def add_job(
+        self,
+        name: str,
+        func: Callable,
+        trigger: Trigger,
+        leader_only: bool = False,
+        timeout: Optional[float] = None,
+        on_timeout: Optional[Callable[[], Any]] = None,
+    ) -> Job:
+        if name in self._jobs:
+            raise ValueError(f"Job already registered: {name}")
+        job = Job(name, func, trigger, leader_only, timeout, on_timeout)
+        self._jobs[name] = job
+        if self._tasks:
+            self._tasks.append(asyncio.create_task(self._run_job(job)))
+        return job
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    async def start(self):
+        if self._tasks:
+            return
+        self._tasks = [
+            asyncio.create_task(self._run_job(job), name=f"job:{job.name}")
+            for job in self._jobs.values()
+        ]
+        print(f"Scheduler started with {len(self._tasks)} jobs")
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self.leader is not None:
+            await asyncio.to_thread(self.leader.release)
+        print("Scheduler stopped")
+
+    async def _is_leader(self) -> bool:
+        if self.leader is None:
+            return True
+        async with self._leader_lock:
+            return await asyncio.to_thread(self.leader.try_acquire)
+
+    async def _run_job(self, job: Job):
+        while True:
+            job.next_run = job.trigger.next_fire(time.time())
+            await asyncio.sleep(max(0.0, job.next_run - time.time()))
+
+            if job.busy:
+                job.metrics.skipped += 1
+                continue
+
+            if job.leader_only and not await self._is_leader():
+                job.metrics.skipped += 1
+                continue
+
+            started = time.time()
+            t0 = time.perf_counter()
+            error = None
+            try:
+                await job.run()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                error = f"{type(e).__name__}: {str(e)}"
+                print(f"Job {job.name} failed: {error}")
+            job.metrics.record(started, time.perf_counter() - t0, error)
+
+    def metrics(self) -> Dict[str, Dict[str, Any]]:
+        return {
+            name: {
+                "leader_only": job.leader_only,
+                "next_run": (
+                    datetime.fromtimestamp(job.next_run, timezone.utc).isoformat()
+                    if job.next_run
+                    else None
+                ),
+                **job.metrics.as_dict(),
+            }
+            for name, job in self._jobs.items()
+        }
@@ -0,0 +1,198 @@
+# app/utils/utils_audit.py
+import json
+import os
+import threading
+import uuid
+from collections import deque
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from fastapi import Request
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.db.enums.enums_audit import AuditOverflowPolicy, AuthEventType
+
+_INFO_KEY = "pending_auth_events"
+
+
+def event_to_json(row: Dict[str, Any]) -> str:
+    return json.dumps(
+        {
+            **row,
+            "event_type": row["event_type"].value,
+            "occurred_at": row["occurred_at"].isoformat(),
+        }
+    )
+
+
+def event_from_json(line: str) -> Dict[str, Any]:
+    row = json.loads(line)
+    row["event_type"] = AuthEventType(row["event_type"])
+    row["occurred_at"] = datetime.fromisoformat(row["occurred_at"])
+    return row
+
+
+class AuditQueue:
+    """
+    Bounded in-memory buffer of audit events between the request path and
+    the background writer. put() never blocks on I/O other than, with the
+    spill policy, one append to a local file once the buffer is full.
+
+    Overflow policies:
+    - drop_oldest: keep the newest events and count what was dropped
+    - spill: append overflowing events to an append-only JSONL file that
+      is replayed into the database at the next startup
+    """
+
+    def __init__(self, maxsize: int, policy: str, spill_file: str):
+        self.maxsize = maxsize
+        self.policy = AuditOverflowPolicy(policy)
+        self.spill_file = spill_file
+        self._events: deque = deque()
+        self._lock = threading.Lock()
+        self._spill_lock = threading.Lock()
+        self.enqueued = 0
+        self.dropped = 0
+        self.spilled = 0
+        self.written = 0
+
+    def __len__(self) -> int:
+        return len(self._events)
+
+    def put(self, row: Dict[str, Any]):
+        with self._lock:
+            self.enqueued += 1
+            if len(self._events) < self.maxsize:
+                self._events.append(row)
+                return
+            if self.policy == AuditOverflowPolicy.DROP_OLDEST:
+                self._events.popleft()
+                self._events.append(row)
+                self.dropped += 1
+                return
+        self.spill([row])
+
+    def requeue(self, rows: List[Dict[str, Any]]):
+        """Put back a batch the writer could not store, oldest first."""
+        with self._lock:
+            room = self.maxsize - len(self._events)
+            keep = rows[:room] if room > 0 else []
+            self._events.extendleft(reversed(keep))
+            overflow = rows[len(keep) :]
+            if overflow and self.policy == AuditOverflowPolicy.DROP_OLDEST:
+                self.dropped += len(overflow)
+                return
+        if overflow:
+            self.spill(overflow)
+
+    def take(self, limit: int) -> List[Dict[str, Any]]:
+        with self._lock:
+            count = min(limit, len(self._events))
+            return [self._events.popleft() for _ in range(count)]
+
+    def spill(self, rows: List[Dict[str, Any]]):
+        data = "".join(event_to_json(row) + "\n" for row in rows)
+        with self._spill_lock:
+            os.makedirs(os.path.dirname(self.spill_file) or ".", exist_ok=True)
+            # One O_APPEND write per call, so workers sharing the file do not interleave lines
+            fd = os.open(self.spill_file, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600)
+            try:
+                os.write(fd, data.encode())
+            finally:
+                os.close(fd)
+            self.spilled += len(rows)
+
+    def info(self) -> Dict[str, Any]:
+        return {
+            "queued": len(self._events),
+            "capacity": self.maxsize,
+            "policy": self.policy.value,
+            "enqueued": self.enqueued,
+            "written": self.written,
+            "dropped": self.dropped,
+            "spilled": self.spilled,
+        }
+
+
+def default_spill_file() -> str:
+    if settings.AUDIT_SPILL_FILE:
+        return settings.AUDIT_SPILL_FILE
+    base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    return os.path.join(base_dir, "database", "audit_spill.jsonl")
+
+
+audit_queue = AuditQueue(
+    settings.AUDIT_QUEUE_SIZE, settings.AUDIT_OVERFLOW_POLICY, default_spill_file()
+)
+
+
+def _client_ip(request: Request) -> Optional[str]:
+    return request.client.host if request.client else None
+
+
+def build_auth_event(
+    request: Request,
+    event_type: AuthEventType,
+    user_id: Optional[int] = None,
+    login: Optional[str] = None,
+    reason: Optional[str] = None,
+) -> Dict[str, Any]:
+    user_agent = request.headers.get("user-agent")
+    return {
+        "event_id": uuid.uuid4().hex,
+        "event_type": event_type,
+        "user_id": user_id,
+        "login": login[:255] if login else login,
+        "reason": reason,
+        "tenant_id": request.headers.get(settings.TENANT_HEADER) or None,
+        "ip_address": _client_ip(request),
+        "user_agent": user_agent[:255] if user_agent else None,
+        "occurred_at": datetime.now(timezone.utc),
+    }
+
+
+def record_auth_event(
+    request: Request,
+    event_type: AuthEventType,
+    *,
+    db: Optional[Session] = None,
+    user: Any = None,
+    user_id: Optional[int] = None,
+    login: Optional[str] = None,
+    reason: Optional[str] = None,
+):
+    """
+    Queue an audit event without touching the database.
+
+    With `db`, the event is held until that session commits and dropped on
+    rollback, so only changes that were actually stored get audited. `user`
+    may be a pending ORM object whose id is filled in when it is flushed.
+    """
+    if not settings.AUDIT_ENABLED:
+        return
+    row = build_auth_event(request, event_type, user_id, login, reason)
+    if db is None:
+        audit_queue.put(row)
+    else:
+        db.info.setdefault(_INFO_KEY, []).append((row, user))
+
+
+@event.listens_for(Session, "after_flush_postexec")
+def _resolve_event_user_ids(session: Session, flush_context):
+    # Primary keys are known after the flush; no SQL may run after commit
+    for row, user in session.info.get(_INFO_KEY, ()):
+        if user is not None and row["user_id"] is None:
+            row["user_id"] = user.id
+
+
+@event.listens_for(Session, "after_commit")
+def _enqueue_committed_events(session: Session):
+    for row, _ in session.info.pop(_INFO_KEY, None) or ():
+        audit_queue.put(row)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_rolled_back_events(session: Session, previous_transaction):
+    session.info.pop(_INFO_KEY, None)
@@ -1,6 +1,9 @@
 # app/utils/utils_auth.py
 from datetime import datetime, timedelta
 from typing import Optional
+import hashlib
+import hmac
+import secrets
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
@@ -8,8 +11,11 @@ from passlib.context import CryptContext
 from sqlalchemy.orm import Session
 
 from app.config import settings
-from app.db.session import get_db
+from app.db.session import get_read_db, get_tenant_id
+from app.db.repositories.repository_user import UserRepository
 from app.schemas.schemas_auth import TokenData
+from app.schemas.schemas_principal import UserPrincipal
+from app.utils.utils_principal_cache import principal_cache
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_PREFIX}/auth/login")
@@ -38,30 +44,68 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     return encoded_jwt
 
 
+def create_refresh_token() -> str:
+    """Generate an opaque, URL-safe refresh token."""
+    return secrets.token_urlsafe(32)
+
+
+def hash_refresh_token(token: str) -> str:
+    """
+    Keyed hash of a refresh token for storage and lookup.
+    HMAC-SHA256 is enough here because refresh tokens are high-entropy random
+    values, so renewal avoids the cost of a bcrypt verification.
+    """
+    return hmac.new(
+        settings.SECRET_KEY.encode(), token.encode(), hashlib.sha256
+    ).hexdigest()
+
+
+def verify_token(token: str) -> dict:
+    """Decode and validate a JWT access token. Raises 401 if invalid."""
+    try:
+        return jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    except JWTError:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+
 async def get_current_user(
-    token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)
-):
+    token: str = Depends(oauth2_scheme),
+    db: Session = Depends(get_read_db),
+    tenant_id: str = Depends(get_tenant_id),
+) -> UserPrincipal:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    try:
-        payload = jwt.decode(
-            token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
-        )
-        email: str = payload.get("sub")
-        if email is None:
-            raise credentials_exception
-        token_data = TokenData(email=email, role=payload.get("role"))
-    except JWTError:
+    payload = verify_token(token)
+    email: str = payload.get("sub")
+    if email is None:
+        raise credentials_exception
+    # The tenant header is client-controlled: a token is only valid in the
+    # tenant it was issued for, or it could be replayed against another one
+    if payload.get("tid") != tenant_id:
         raise credentials_exception
+    token_data = TokenData(email=email, role=payload.get("role"))
 
-    from app.db.models.models_user import User  # Import here to avoid circular imports
+    # Cached per worker; a hit needs no database connection at all
+    cache_key = (db.get_bind().url, tenant_id, token_data.email)
+    if principal_cache.enabled:
+        user = principal_cache.get(cache_key)
+        if user is not None:
+            return user
+    generation = principal_cache.generation
 
-    user = db.query(User).filter(User.email == token_data.email).first()
+    # Column-limited load into an immutable snapshot; no ORM entity is built
+    user = UserRepository(db).get_principal_by_email(token_data.email)
     if user is None:
         raise credentials_exception
+    if principal_cache.enabled:
+        principal_cache.put(cache_key, user, generation)
     return user
 
 
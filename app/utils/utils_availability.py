@@ -0,0 +1,113 @@
+# app/utils/utils_availability.py
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import func, select
+
+from app.config import settings
+from app.db.models.models_user import User
+from app.utils.utils_bloom import BloomFilter
+
+users = User.__table__
+
+_USERNAME = "u:"
+_EMAIL = "e:"
+
+
+def normalize(value: str) -> str:
+    """Case- and whitespace-insensitive form; a superset of exact matches."""
+    return value.strip().lower()
+
+
+class AvailabilityIndex:
+    """
+    Per-worker Bloom filter of normalized usernames and emails.
+
+    A miss proves a value is not taken, so most "available" answers need no
+    database work. A hit may be a false positive and must be confirmed with
+    an indexed lookup. Until the first build completes every value is a
+    possible hit, so answers stay correct, just slower.
+    """
+
+    def __init__(self):
+        self._filter: Optional[BloomFilter] = None
+        self._lock = threading.Lock()
+        # Values added while a rebuild scan is running, replayed into the new filter
+        self._pending: Optional[List[str]] = None
+        self.built_at: Optional[float] = None
+
+    @property
+    def ready(self) -> bool:
+        return self._filter is not None
+
+    def _might_contain(self, key: str) -> bool:
+        bloom = self._filter
+        return bloom is None or key in bloom
+
+    def username_might_exist(self, username: str) -> bool:
+        return self._might_contain(_USERNAME + normalize(username))
+
+    def email_might_exist(self, email: str) -> bool:
+        return self._might_contain(_EMAIL + normalize(email))
+
+    def add(self, username: str, email: str):
+        keys = (_USERNAME + normalize(username), _EMAIL + normalize(email))
+        with self._lock:
+            if self._filter is not None:
+                for key in keys:
+                    self._filter.add(key)
+            if self._pending is not None:
+                self._pending.extend(keys)
+
+    def rebuild(self, session_maker) -> int:
+        """
+        Build a new filter with a streaming scan of users and swap it in.
+        Sized for twice the current user count (two keys per user) so that
+        registrations do not saturate it before the next rebuild.
+        Returns the number of users scanned.
+        """
+        with self._lock:
+            self._pending = []
+        try:
+            with session_maker() as db:
+                total = db.execute(select(func.count()).select_from(users)).scalar()
+                bloom = BloomFilter(
+                    max(4 * (total or 0), 20_000),
+                    settings.AVAILABILITY_BLOOM_ERROR_RATE,
+                )
+                result = db.execute(
+                    select(users.c.username, users.c.email).execution_options(
+                        stream_results=True, yield_per=5_000
+                    )
+                )
+                scanned = 0
+                for username, email in result:
+                    bloom.add(_USERNAME + normalize(username))
+                    bloom.add(_EMAIL + normalize(email))
+                    scanned += 1
+            with self._lock:
+                for key in self._pending:
+                    bloom.add(key)
+                self._filter = bloom
+                self.built_at = time.time()
+        finally:
+            with self._lock:
+                self._pending = None
+        return scanned
+
+    def info(self) -> Dict[str, Any]:
+        bloom = self._filter
+        if bloom is None:
+            return {"ready": False}
+        return {
+            "ready": True,
+            "entries": bloom.count,
+            "capacity": bloom.capacity,
+            "size_bytes": bloom.size_bytes,
+            "hashes": bloom.num_hashes,
+            "built_at": self.built_at,
+        }
+
+
+availability_index = AvailabilityIndex()
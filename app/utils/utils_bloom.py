@@ -0,0 +1,49 @@
+# app/utils/utils_bloom.py
+import math
+from hashlib import blake2b
+
+
+class BloomFilter:
+    """
+    Fixed-size Bloom filter over strings.
+    No false negatives; false positives at about `error_rate` while the number
+    of added items stays within `capacity`.
+    """
+
+    __slots__ = ("capacity", "error_rate", "num_bits", "num_hashes", "count", "_bits")
+
+    def __init__(self, capacity: int, error_rate: float = 0.01):
+        if capacity < 1:
+            raise ValueError("Capacity must be positive")
+        if not 0 < error_rate < 1:
+            raise ValueError("Error rate must be between 0 and 1")
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.num_bits = max(
+            8, math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2))
+        )
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self.count = 0
+        self._bits = bytearray((self.num_bits + 7) // 8)
+
+    def _positions(self, item: str):
+        # Kirsch-Mitzenmacher: k indexes from two 64-bit halves of one digest
+        digest = blake2b(item.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        m = self.num_bits
+        return ((h1 + i * h2) % m for i in range(self.num_hashes))
+
+    def add(self, item: str):
+        bits = self._bits
+        for pos in self._positions(item):
+            bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, item: str) -> bool:
+        bits = self._bits
+        return all(bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+
+    @property
+    def size_bytes(self) -> int:
+        return len(self._bits)
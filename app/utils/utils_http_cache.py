@@ -0,0 +1,51 @@
+# app/utils/utils_http_cache.py
+import hashlib
+import json
+from typing import Any, Dict, Optional
+
+from fastapi import Request, Response
+
+from app.schemas.schemas_principal import UserPrincipal
+
+
+def weak_etag(*parts: Any) -> str:
+    """Weak validator from the given version parts."""
+    digest = hashlib.blake2b(
+        "|".join(str(part) for part in parts).encode(), digest_size=12
+    ).hexdigest()
+    return f'W/"{digest}"'
+
+
+def payload_etag(payload: Any) -> str:
+    """Weak validator of a JSON-serializable payload."""
+    return weak_etag(json.dumps(payload, sort_keys=True, default=str))
+
+
+def principal_etag(principal: UserPrincipal) -> str:
+    """Validator of a user's representation: changes whenever the row is updated."""
+    updated_at = principal.updated_at.isoformat() if principal.updated_at else ""
+    return weak_etag("user", principal.id, updated_at)
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Weak comparison of If-None-Match (RFC 9110, 13.1.2) against `etag`."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in header.split(","))
+
+
+def not_modified(headers: Dict[str, str]) -> Response:
+    return Response(status_code=304, headers=headers)
+
+
+def conditional_headers(
+    etag: str, cache_control: str, vary: Optional[str] = None
+) -> Dict[str, str]:
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if vary:
+        headers["Vary"] = vary
+    return headers
@@ -0,0 +1,118 @@
+# app/utils/utils_principal_cache.py
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional, Set
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.db.models.models_user import User
+from app.schemas.schemas_principal import UserPrincipal
+
+_INFO_KEY = "principal_cache_invalidations"
+
+
+class PrincipalCache:
+    """
+    Per-worker LRU of authenticated principals keyed by
+    (database URL, tenant id, email).
+
+    Entries expire after `ttl` seconds, which also bounds how long a change
+    made through another worker can go unnoticed. ORM writes to users in this
+    worker invalidate their entries directly (see the session listeners below).
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        # Bumped on every invalidation; a load that started before one is not stored
+        self.generation = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0 and self.maxsize > 0
+
+    def get(self, key: Hashable) -> Optional[UserPrincipal]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            principal, expires = entry
+            if expires < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return principal
+
+    def put(self, key: Hashable, principal: UserPrincipal, generation: int):
+        """Store a principal loaded while the cache was at `generation`."""
+        with self._lock:
+            if generation != self.generation:
+                return
+            self._entries[key] = (principal, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, bind_url: Any, emails: Set[str]):
+        """Drop the entries of `emails` on `bind_url` under every tenant id."""
+        with self._lock:
+            self.generation += 1
+            stale = [
+                key
+                for key in self._entries
+                if key[0] == bind_url and key[-1] in emails
+            ]
+            for key in stale:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self.generation += 1
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+principal_cache = PrincipalCache(
+    settings.PRINCIPAL_CACHE_SIZE, settings.PRINCIPAL_CACHE_TTL_SECONDS
+)
+
+
+def _user_emails(user: User) -> Set[str]:
+    """Current and, if it changed, previous email of a user."""
+    history = inspect(user).attrs["email"].history
+    emails = set(history.added) | set(history.deleted) | set(history.unchanged)
+    return {email for email in emails if email}
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_changed_principals(session: Session, flush_context):
+    emails: Set[str] = set()
+    for obj in session.dirty:
+        if isinstance(obj, User):
+            emails |= _user_emails(obj)
+    for obj in session.deleted:
+        if isinstance(obj, User):
+            emails |= _user_emails(obj)
+    if emails:
+        session.info.setdefault(_INFO_KEY, set()).update(emails)
+        principal_cache.invalidate(session.get_bind().url, emails)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed_principals(session: Session):
+    # Again after commit, in case a reader cached the old row in between
+    emails = session.info.pop(_INFO_KEY, None)
+    if emails:
+        principal_cache.invalidate(session.get_bind().url, emails)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_principal_invalidations(session: Session, previous_transaction):
+    session.info.pop(_INFO_KEY, None)
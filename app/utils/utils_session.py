@@ -0,0 +1,123 @@
+# app/utils/utils_session.py
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Tuple
+from sqlalchemy import select, delete, update
+from sqlalchemy.orm import Session, aliased
+
+from app.config import settings
+from app.db.models.models_user import User
+from app.db.models.models_session import UserSession
+from app.utils.utils_auth import create_refresh_token, hash_refresh_token
+
+
+def create_session(db: Session, user_id: int) -> Tuple[UserSession, str]:
+    """
+    Create a refresh-token session for a user.
+    Returns the session row and the raw refresh token; only the hash is stored.
+    The caller is responsible for committing.
+    """
+    token = create_refresh_token()
+    session = UserSession(
+        user_id=user_id,
+        token_hash=hash_refresh_token(token),
+        expires_at=datetime.now(timezone.utc)
+        + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS),
+    )
+    db.add(session)
+    return session, token
+
+
+def get_session_with_user(db: Session, token: str):
+    """
+    Look up a session and the fields needed to mint an access token.
+    Single indexed lookup on token_hash joined to users by primary key.
+    Returns (session, email, role, is_active, status) or None.
+    """
+    stmt = (
+        select(UserSession, User.email, User.role, User.is_active, User.status)
+        .join(User, User.id == UserSession.user_id)
+        .where(UserSession.token_hash == hash_refresh_token(token))
+    )
+    return db.execute(stmt).first()
+
+
+def rotate_session(
+    db: Session, session: UserSession
+) -> Optional[Tuple[UserSession, str]]:
+    """
+    Replace a session with a fresh one and revoke the old token.
+
+    The old session is revoked with a conditional UPDATE, so of two
+    concurrent refreshes with the same token only one can win; the other
+    gets None and must treat the token as reused.
+    """
+    claimed = db.execute(
+        update(UserSession)
+        .where(UserSession.id == session.id, UserSession.revoked_at.is_(None))
+        .values(revoked_at=datetime.now(timezone.utc))
+    ).rowcount
+    if not claimed:
+        return None
+    new_session, token = create_session(db, session.user_id)
+    db.flush()
+    session.replaced_by_id = new_session.id
+    return new_session, token
+
+
+def revoke_session_family(db: Session, session: UserSession) -> int:
+    """
+    Revoke a session and every session rotated from it, following
+    replaced_by_id. Other sessions of the user, e.g. on other devices, are
+    left alone. Returns the number of sessions revoked.
+    """
+    chain = (
+        select(UserSession.id)
+        .where(UserSession.id == session.id)
+        .cte("session_chain", recursive=True)
+    )
+    member = aliased(UserSession)
+    chain = chain.union_all(
+        select(member.replaced_by_id).where(
+            member.id == chain.c.id, member.replaced_by_id.is_not(None)
+        )
+    )
+    return db.execute(
+        update(UserSession)
+        .where(UserSession.id.in_(select(chain.c.id)), UserSession.revoked_at.is_(None))
+        .values(revoked_at=datetime.now(timezone.utc))
+        .execution_options(synchronize_session=False)
+    ).rowcount
+
+
+def purge_expired_sessions(db: Session, batch_size: Optional[int] = None) -> int:
+    """
+    Delete expired sessions in batches.
+    Revoked sessions are kept until their original expiry so that reuse of a
+    rotated token can still be detected. Each batch is committed separately
+    to keep lock times short. Returns the total number of rows deleted.
+    """
+    batch_size = batch_size or settings.SESSION_PURGE_BATCH_SIZE
+    now = datetime.now(timezone.utc)
+    total = 0
+
+    while True:
+        ids = (
+            db.execute(
+                select(UserSession.id)
+                .where(UserSession.expires_at <= now)
+                .limit(batch_size)
+            )
+            .scalars()
+            .all()
+        )
+        if not ids:
+            break
+
+        db.execute(delete(UserSession).where(UserSession.id.in_(ids)))
+        db.commit()
+        total += len(ids)
+
+        if len(ids) < batch_size:
+            break
+
+    return total
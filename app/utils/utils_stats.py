@@ -0,0 +1,78 @@
+# app/utils/utils_stats.py
+from collections import Counter
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from app.db.models.models_user import User
+from app.db.repositories.repository_stats import (
+    ACTIVE,
+    LAST_LOGIN_DAY,
+    ROLE,
+    STATUS,
+    UserStatsRepository,
+    day_bucket,
+    user_stat_keys,
+)
+
+# Attributes whose changes move a user between counter buckets
+_TRACKED = (
+    ("role", ROLE, lambda v: getattr(v, "value", v)),
+    ("status", STATUS, lambda v: getattr(v, "value", v)),
+    ("is_active", ACTIVE, lambda v: "true" if v else "false"),
+    ("last_login", LAST_LOGIN_DAY, day_bucket),
+)
+
+
+def _user_keys(user: User) -> Counter:
+    return user_stat_keys(
+        user.role, user.status, user.is_active, user.created_at, user.last_login
+    )
+
+
+def _changed_keys(user: User) -> Counter:
+    """Counter deltas for the tracked attributes changed on a persistent user."""
+    deltas: Counter = Counter()
+    state = inspect(user)
+    for attr, metric, to_bucket in _TRACKED:
+        history = state.attrs[attr].history
+        if not history.added or not history.deleted:
+            # Unchanged, or old value not loaded; reconciliation catches the latter
+            continue
+        old, new = to_bucket(history.deleted[0]), to_bucket(history.added[0])
+        if old == new:
+            continue
+        if old is not None:
+            deltas[(metric, old)] -= 1
+        if new is not None:
+            deltas[(metric, new)] += 1
+    return deltas
+
+
+@event.listens_for(Session, "after_flush")
+def _update_user_stats(session: Session, flush_context):
+    """
+    Keep user_stats in step with ORM writes to users, in the same transaction:
+    registrations, role/status changes (including soft_delete) and deletes.
+    """
+    deltas: Counter = Counter()
+    for obj in session.new:
+        if isinstance(obj, User):
+            deltas.update(_user_keys(obj))
+    for obj in session.dirty:
+        if isinstance(obj, User):
+            deltas.update(_changed_keys(obj))
+    for obj in session.deleted:
+        if isinstance(obj, User):
+            deltas.subtract(_user_keys(obj))
+
+    if deltas:
+        # Core execution on the flush connection; Session.execute would autoflush
+        UserStatsRepository(session.connection()).apply(deltas)
+
+
+def record_login(db: Session, previous: Optional[datetime], current: datetime):
+    """Stats hook for logins that update last_login without the ORM."""
+    UserStatsRepository(db).record_login(previous, current)
@@ -0,0 +1,109 @@
+# benchmarks/bench_principal.py
+"""
+Allocations per authenticated request and memory per cached entry for a
+full User entity versus a UserPrincipal snapshot.
+
+    per request   peak bytes allocated while serving one principal lookup,
+                  measured with tracemalloc (session created and closed)
+    per entry     retained bytes per object when N loaded objects are kept
+                  alive, as a principal cache would
+
+Usage:
+    python benchmarks/bench_principal.py [entries]
+"""
+
+import gc
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("ECHO_SQL", "false")
+
+from sqlalchemy import create_engine  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+from sqlalchemy.pool import StaticPool  # noqa: E402
+
+from app.db.database import Base  # noqa: E402
+from app.db.models.models_user import User  # noqa: E402
+from app.db.enums.enums_user import UserStatus  # noqa: E402
+from app.db.repositories.repository_user import UserRepository  # noqa: E402
+
+
+def load_entity(session_maker, email):
+    with session_maker() as db:
+        return db.query(User).filter(User.email == email).first()
+
+
+def load_principal(session_maker, email):
+    with session_maker() as db:
+        return UserRepository(db).get_principal_by_email(email)
+
+
+def per_request(loader, session_maker, email, rounds=500):
+    for _ in range(20):
+        loader(session_maker, email)
+    gc.collect()
+    tracemalloc.start()
+    peak_total = 0
+    for _ in range(rounds):
+        current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        loader(session_maker, email)
+        _, peak = tracemalloc.get_traced_memory()
+        peak_total += peak - current
+    tracemalloc.stop()
+    return peak_total / rounds
+
+
+def per_entry(loader, session_maker, emails):
+    gc.collect()
+    tracemalloc.start()
+    start, _ = tracemalloc.get_traced_memory()
+    kept = [loader(session_maker, email) for email in emails]
+    gc.collect()
+    end, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert all(kept)
+    return (end - start) / len(kept)
+
+
+def main():
+    entries = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(bind=engine)
+    session_maker = sessionmaker(autoflush=False, expire_on_commit=False, bind=engine)
+
+    emails = [f"user{i}@example.com" for i in range(entries)]
+    with session_maker() as db:
+        db.add_all(
+            User(
+                email=email,
+                username=f"user{i}",
+                hashed_password="x" * 60,
+                first_name="First",
+                last_name="Last",
+                status=UserStatus.ACTIVE,
+            )
+            for i, email in enumerate(emails)
+        )
+        db.commit()
+
+    print(f"{'type':<15}{'peak bytes/req':>16}{'bytes/entry':>13}")
+    for name, loader in (
+        ("User entity", load_entity),
+        ("UserPrincipal", load_principal),
+    ):
+        peak = per_request(loader, session_maker, emails[0])
+        entry = per_entry(loader, session_maker, emails)
+        print(f"{name:<15}{peak:>16.0f}{entry:>13.0f}")
+
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
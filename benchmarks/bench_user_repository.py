@@ -0,0 +1,117 @@
+# benchmarks/bench_user_repository.py
+"""
+Per-call Python overhead of UserRepository against the legacy
+db.query(User).filter(...).first() lookups.
+
+A single session and an in-memory SQLite database are used so that the
+numbers are dominated by statement construction, compilation lookup and
+result processing rather than I/O.
+
+Usage:
+    python benchmarks/bench_user_repository.py [iterations]
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("ECHO_SQL", "false")
+
+from sqlalchemy import create_engine  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+from sqlalchemy.pool import StaticPool  # noqa: E402
+
+from app.db.database import Base  # noqa: E402
+from app.db.models.models_user import User  # noqa: E402
+from app.db.enums.enums_user import UserStatus  # noqa: E402
+from app.db.repositories.repository_user import UserRepository  # noqa: E402
+
+EMAIL = "bench@example.com"
+USERNAME = "bench"
+
+
+def legacy_by_email(db):
+    return db.query(User).filter(User.email == EMAIL).first()
+
+
+def legacy_login(db):
+    return (
+        db.query(User)
+        .filter((User.email == USERNAME) | (User.username == USERNAME))
+        .first()
+    )
+
+
+def legacy_register_checks(db):
+    return (
+        db.query(User).filter(User.email == "new@example.com").first(),
+        db.query(User).filter(User.username == "new").first(),
+    )
+
+
+def repo_by_email(db):
+    return UserRepository(db).get_by_email(EMAIL)
+
+
+def repo_login(db):
+    return UserRepository(db).get_auth_by_login(USERNAME)
+
+
+def repo_register_checks(db):
+    return UserRepository(db).find_registration_conflict("new@example.com", "new")
+
+
+CASES = [
+    ("by email", legacy_by_email, repo_by_email),
+    ("login filter", legacy_login, repo_login),
+    ("register checks", legacy_register_checks, repo_register_checks),
+]
+
+
+def measure(fn, db, iterations: int) -> float:
+    for _ in range(min(200, iterations)):
+        fn(db)
+    # Drop identity-map state between calls, as a new request would
+    db.expunge_all()
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn(db)
+        db.expunge_all()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(autoflush=False, expire_on_commit=False, bind=engine)()
+    db.add(
+        User(
+            email=EMAIL,
+            username=USERNAME,
+            hashed_password="x",
+            status=UserStatus.ACTIVE,
+        )
+    )
+    db.commit()
+
+    print(f"{'query':<18}{'legacy us':>11}{'repo us':>11}{'speedup':>9}")
+    for name, legacy, repo in CASES:
+        legacy_us = measure(legacy, db, iterations)
+        repo_us = measure(repo, db, iterations)
+        print(
+            f"{name:<18}{legacy_us:>11.1f}{repo_us:>11.1f}"
+            f"{legacy_us / repo_us:>8.1f}x"
+        )
+
+    db.close()
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    main()